@@ -1,9 +1,18 @@
 """Agents module for LangGraph workflows and nodes."""
 
-from agents.workflow import create_multi_agent_workflow, run_multi_agent_workflow
+from typing import Any
 
 __all__ = [
     "create_multi_agent_workflow",
     "run_multi_agent_workflow",
 ]
 
+
+def __getattr__(name: str) -> Any:
+    # 延迟导入：`agents.workflow` 会加载全部节点与工具，仅在真正访问时才导入，
+    # 使 `agents.expert_graph` 等子模块可以单独导入。
+    if name in __all__:
+        from agents import workflow
+
+        return getattr(workflow, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
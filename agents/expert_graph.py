@@ -2,9 +2,11 @@
 使用 LangGraph 子图模式实现专家智能体的工具调用循环。
 """
 
+import asyncio
+import hashlib
 import logging
+import os
 from typing import List, Optional, Any, Dict
-from langchain_core.messages import BaseMessage
 from langchain_core.output_parsers import PydanticOutputParser
 from langchain_core.language_models import BaseChatModel
 from langgraph.graph import StateGraph, END
@@ -12,11 +14,76 @@ from langgraph.prebuilt import ToolNode
 from core.state import RiskItem, ExpertState
 from core.config import Config
 from langchain_core.tools import BaseTool
-from util.json_utils import extract_json_from_text
-from agents.expert_graph_runtime import ExpertGraphRuntime
+from util.json_utils import load_json_from_text
+from util.yaml_utils import get_yaml_format_instructions, load_yaml_mapping
+from agents.expert_graph_runtime import (
+    ExpertGraphRuntime,
+    history_limits_from_env,
+    make_reasoner_cache_key,
+    output_format_label,
+)
+from util.llm_cache import model_identity
+
+try:
+    from langgraph.types import CachePolicy
+    from langgraph.cache.memory import InMemoryCache
+except ImportError:  # langgraph < 0.4 不支持节点级缓存
+    CachePolicy = None
+    InMemoryCache = None
 
 logger = logging.getLogger(__name__)
 
+# reasoner 节点缓存的有效期（秒）
+REASONER_CACHE_TTL_SECONDS = 300
+
+# RiskItem 解析器与格式说明（模块级构建一次，避免每次编译子图/分析时重复遍历 schema）
+_RISK_PARSER = PydanticOutputParser(pydantic_object=RiskItem)
+_JSON_FORMAT_INSTRUCTIONS = _RISK_PARSER.get_format_instructions()
+_YAML_FORMAT_INSTRUCTIONS = get_yaml_format_instructions(RiskItem)
+
+# 专家分析结果缓存：同一模型、同一仓库快照（repo/branch/commit）下，相同风险项 + 相同上下文
+# 直接复用上次的 RiskItem（设置 EXPERT_RESPONSE_CACHE=0 关闭）。每条记录会持有完整对话历史，容量保持较小。
+_RESULT_CACHE_MAX_ITEMS = 128
+_result_cache: Dict[str, dict] = {}
+
+
+def _response_cache_enabled() -> bool:
+    val = os.environ.get("EXPERT_RESPONSE_CACHE", "1").strip().lower()
+    return val not in {"0", "false", "no", "n", "off"}
+
+
+def expert_cache_scope(llm: BaseChatModel, config: Optional[Config]) -> Optional[str]:
+    """计算专家结果缓存的作用域（模型标识 + 仓库快照）。
+    
+    工具调用会读取当前文件以外的内容，因此结果只在同一模型、同一 repo/branch/commit 下可复用。
+    无法确定仓库快照（缺少 asset_key 或 commit 未知）时返回 None，此时不使用结果缓存。
+    
+    Args:
+        llm: 专家子图使用的 LLM。
+        config: 当前工作流配置。
+    
+    Returns:
+        缓存作用域字符串；无法确定时返回 None。
+    """
+    asset_key = config.system.asset_key if config else None
+    if not asset_key or "unknown_commit" in asset_key:
+        return None
+    return f"{model_identity(llm)}\x1f{asset_key}"
+
+
+def _result_cache_key(
+    cache_scope: str,
+    risk_item: RiskItem,
+    diff_context: Optional[str],
+    file_content: Optional[str],
+    output_format: str,
+) -> str:
+    h = hashlib.sha256()
+    for part in (cache_scope, risk_item.model_dump_json(), output_format, diff_context or "", file_content or ""):
+        h.update(part.encode("utf-8"))
+        h.update(b"\x1f")
+    return h.hexdigest()
+
 
 def create_langchain_tools(
     workspace_root: Optional[str] = None,
@@ -36,18 +103,11 @@ def create_langchain_tools(
     from tools.langchain_tools import create_tools_with_context
     from pathlib import Path
     
-    if workspace_root:
-        workspace_path = Path(workspace_root)
-        return create_tools_with_context(
-            workspace_root=workspace_path,
-            asset_key=asset_key
-        )
-    else:
-        # 如果没有 workspace_root，仍然创建工具（使用默认值）
-        return create_tools_with_context(
-            workspace_root=None,
-            asset_key=asset_key
-        )
+    # 如果没有 workspace_root，仍然创建工具（使用默认值）
+    return create_tools_with_context(
+        workspace_root=Path(workspace_root) if workspace_root else None,
+        asset_key=asset_key
+    )
 
 
 def tools_condition(state: ExpertState) -> str:
@@ -75,6 +135,7 @@ def build_expert_graph(
     llm: BaseChatModel,
     tools: List[BaseTool],
     config: Optional[Config] = None,
+    llm_semaphore: Optional[asyncio.Semaphore] = None,
 ) -> Any:
     """构建专家分析子图。
     
@@ -87,6 +148,7 @@ def build_expert_graph(
         llm: LangChain 标准 ChatModel。
         tools: LangChain 工具列表。
         config: 配置对象（可选），用于获取最大轮次限制。
+        llm_semaphore: 跨专家组共享的信号量（可选），仅在 LLM 调用期间持有。
     
     Returns:
         编译后的 LangGraph 子图。
@@ -99,9 +161,9 @@ def build_expert_graph(
     # 创建工具节点
     tool_node = ToolNode(tools)
     
-    # 创建 Pydantic 解析器
-    parser = PydanticOutputParser(pydantic_object=RiskItem)
-    format_instructions = parser.get_format_instructions()
+    # 生成输出格式说明（YAML 输出的补全 token 更少；JSON 为默认）
+    output_format = config.system.expert_output_format if config else "json"
+    format_instructions = _YAML_FORMAT_INSTRUCTIONS if output_format == "yaml" else _JSON_FORMAT_INSTRUCTIONS
     
     # 格式化可用工具描述
     tool_descriptions = []
@@ -117,13 +179,24 @@ def build_expert_graph(
         tools_enabled=tools_enabled,
         available_tools_text=available_tools_text,
         format_instructions=format_instructions,
+        output_format=output_format_label(output_format),
+        **history_limits_from_env(),
+        llm_semaphore=llm_semaphore,
     )
     
     # 构建图
     graph = StateGraph(ExpertState)
     
-    # 添加节点
-    graph.add_node("reasoner", runtime.reasoner)
+    # 添加节点（reasoner 启用节点级缓存，模型、提示词上下文与消息历史完全相同时直接复用上次的 LLM 输出）
+    if CachePolicy is not None:
+        cache_key = make_reasoner_cache_key(model_identity(llm), format_instructions, available_tools_text)
+        graph.add_node(
+            "reasoner",
+            runtime.reasoner,
+            cache_policy=CachePolicy(key_func=cache_key, ttl=REASONER_CACHE_TTL_SECONDS),
+        )
+    else:
+        graph.add_node("reasoner", runtime.reasoner)
     graph.add_node("tools", tool_node)
     
     # 设置入口点
@@ -147,25 +220,101 @@ def build_expert_graph(
     # 工具执行后回到 reasoner
     graph.add_edge("tools", "reasoner")
     
-    # 编译图
+    # 编译图（节点缓存随子图创建，不跨子图/跨审查共享）
+    if CachePolicy is not None and InMemoryCache is not None:
+        return graph.compile(cache=InMemoryCache())
     return graph.compile()
 
 
+def _initial_state(
+    risk_item: RiskItem,
+    diff_context: Optional[str],
+    file_content: Optional[str],
+) -> ExpertState:
+    return {
+        "messages": [],
+        "risk_context": risk_item,
+        "final_result": None,
+        "diff_context": diff_context,
+        "file_content": file_content
+    }
+
+
+def _graph_config(recursion_limit: Optional[int], max_concurrency: Optional[int] = None) -> Dict[str, Any]:
+    graph_config: Dict[str, Any] = {}
+    if recursion_limit is not None:
+        graph_config["recursion_limit"] = int(recursion_limit)
+    if max_concurrency is not None:
+        graph_config["max_concurrency"] = max(1, int(max_concurrency))
+    return graph_config
+
+
+def _cached_result(cache_key: Optional[str]) -> Optional[dict]:
+    if cache_key is None:
+        return None
+    cached = _result_cache.get(cache_key)
+    if cached is None:
+        return None
+    return {"result": cached["result"].model_copy(), "messages": list(cached["messages"])}
+
+
+async def _finalize_state(final_state: Any, output_format: str, cache_key: Optional[str]) -> Optional[dict]:
+    """从子图最终状态中解析 RiskItem，并写入结果缓存。"""
+    # 从消息中提取最后一条消息的文本内容
+    messages = final_state.get("messages", [])
+    if not messages:
+        logger.warning("No messages in final state")
+        return None
+    
+    # 获取最后一条消息的文本内容
+    last_message = messages[-1]
+    response_text = last_message.content if hasattr(last_message, "content") else str(last_message)
+    
+    # 按期望格式解析（正则/YAML 解析为同步 CPU 操作，放到线程中执行以免阻塞事件循环）
+    result = await asyncio.to_thread(_parse_risk_item, _RISK_PARSER, response_text, output_format)
+    if result is None:
+        logger.warning(f"Could not parse RiskItem ({output_format}) from response")
+        logger.warning(f"Response text (first 500 chars): {response_text[:500]}")
+        return None
+    
+    if cache_key is not None:
+        if len(_result_cache) >= _RESULT_CACHE_MAX_ITEMS:
+            _result_cache.pop(next(iter(_result_cache)))
+        _result_cache[cache_key] = {"result": result, "messages": list(messages)}
+    
+    return {
+        "result": result,
+        "messages": messages
+    }
+
+
+def _log_analysis_error(e: BaseException) -> None:
+    import traceback
+    error_msg = str(e) if str(e) else type(e).__name__
+    error_traceback = traceback.format_exception(type(e), e, e.__traceback__)
+    logger.error(f"Error running expert analysis: {error_msg}")
+    logger.error(f"Traceback:\n{''.join(error_traceback)}")
+
+
 async def run_expert_analysis(
     graph: Any,
     risk_item: RiskItem,
     diff_context: Optional[str] = None,
     file_content: Optional[str] = None,
     recursion_limit: Optional[int] = None,
+    output_format: str = "json",
+    cache_scope: Optional[str] = None,
 ) -> Optional[dict]:
     """运行专家分析子图。
     
     Args:
         graph: 编译后的专家子图。
         risk_item: 待分析的风险项。
-        risk_type_str: 风险类型字符串（用于渲染提示词模板）。
         diff_context: 文件的 diff 上下文（可选）。
         file_content: 文件的完整内容（可选）。
+        recursion_limit: 子图递归上限（可选）。
+        output_format: 期望的输出格式（"json" 或 "yaml"），另一种格式作为回退。
+        cache_scope: 结果缓存作用域（见 `expert_cache_scope`），为 None 时不使用结果缓存。
     
     Returns:
         包含 'result' 和 'messages' 的字典，如果失败则返回 None。
@@ -173,59 +322,126 @@ async def run_expert_analysis(
         - messages: 对话历史（消息列表）
     """
     try:
-        # 创建 Pydantic 解析器
-        parser = PydanticOutputParser(pydantic_object=RiskItem)
-        
-        # 初始化状态
-        initial_state: ExpertState = {
-            "messages": [],
-            "risk_context": risk_item,
-            "final_result": None,
-            "diff_context": diff_context,
-            "file_content": file_content
-        }
+        cache_key: Optional[str] = None
+        if cache_scope is not None and _response_cache_enabled():
+            cache_key = _result_cache_key(cache_scope, risk_item, diff_context, file_content, output_format)
+            cached = _cached_result(cache_key)
+            if cached is not None:
+                logger.debug(f"Expert result cache hit: {risk_item.file_path}:{risk_item.line_number}")
+                return cached
         
         # 运行子图
-        invoke_kwargs: Dict[str, Any] = {}
-        if recursion_limit is not None:
-            invoke_kwargs["config"] = {"recursion_limit": int(recursion_limit)}
-        final_state = await graph.ainvoke(initial_state, **invoke_kwargs)
-        
-        # 从消息中提取最后一条消息的文本内容
-        messages = final_state.get("messages", [])
-        if not messages:
-            logger.warning("No messages in final state")
-            return None
+        graph_config = _graph_config(recursion_limit)
+        invoke_kwargs: Dict[str, Any] = {"config": graph_config} if graph_config else {}
+        final_state = await graph.ainvoke(_initial_state(risk_item, diff_context, file_content), **invoke_kwargs)
+        return await _finalize_state(final_state, output_format, cache_key)
         
-        # 获取最后一条消息的文本内容
-        last_message = messages[-1]
-        response_text = last_message.content if hasattr(last_message, "content") else str(last_message)
-        
-        # 从响应文本中提取 JSON
-        json_text = extract_json_from_text(response_text)
-        if not json_text:
-            logger.warning("Could not extract JSON from response")
-            logger.warning(f"Response text (first 500 chars): {response_text[:500]}")
+    except Exception as e:
+        _log_analysis_error(e)
+        return None
+
+
+async def run_expert_analyses_batch(
+    graph: Any,
+    risk_items: List[RiskItem],
+    diff_contexts: List[Optional[str]],
+    file_contents: List[Optional[str]],
+    concurrency: int = 8,
+    recursion_limit: Optional[int] = None,
+    output_format: str = "json",
+    cache_scope: Optional[str] = None,
+) -> List[Optional[dict]]:
+    """批量运行专家分析（共享同一个编译后的子图，通过 `graph.abatch` 一次提交）。
+    
+    命中结果缓存的风险项直接返回，其余风险项的初始状态一次性交给 `graph.abatch`，
+    由 LangGraph 按 `max_concurrency` 调度；跨专家组的 LLM 限流由构建子图时传入的
+    `llm_semaphore` 负责。
+    
+    Args:
+        graph: 编译后的专家子图（无状态，可被多个任务复用）。
+        risk_items: 待分析的风险项列表。
+        diff_contexts: 与 risk_items 一一对应的 diff 上下文。
+        file_contents: 与 risk_items 一一对应的文件内容。
+        concurrency: 同时运行的子图数上限。
+        recursion_limit: 子图递归上限（可选）。
+        output_format: 期望的输出格式（"json" 或 "yaml"）。
+        cache_scope: 结果缓存作用域（见 `expert_cache_scope`），为 None 时不使用结果缓存。
+    
+    Returns:
+        与 risk_items 顺序一致的结果列表，失败项为 None。
+    """
+    results: List[Optional[dict]] = [None] * len(risk_items)
+    cache_keys: List[Optional[str]] = [None] * len(risk_items)
+    pending: List[int] = []
+    use_cache = cache_scope is not None and _response_cache_enabled()
+    for i, risk_item in enumerate(risk_items):
+        if use_cache:
+            cache_keys[i] = _result_cache_key(cache_scope, risk_item, diff_contexts[i], file_contents[i], output_format)
+            cached = _cached_result(cache_keys[i])
+            if cached is not None:
+                logger.debug(f"Expert result cache hit: {risk_item.file_path}:{risk_item.line_number}")
+                results[i] = cached
+                continue
+        pending.append(i)
+
+    if not pending:
+        return results
+
+    initial_states = [_initial_state(risk_items[i], diff_contexts[i], file_contents[i]) for i in pending]
+    try:
+        final_states = await graph.abatch(
+            initial_states,
+            config=_graph_config(recursion_limit, concurrency),
+            return_exceptions=True,
+        )
+    except Exception as e:
+        _log_analysis_error(e)
+        return results
+
+    async def _finalize(i: int, final_state: Any) -> Optional[dict]:
+        if isinstance(final_state, BaseException):
+            _log_analysis_error(final_state)
             return None
-        
-        # 使用 PydanticOutputParser 解析提取的 JSON
         try:
-            result: RiskItem = parser.parse(json_text)
+            return await _finalize_state(final_state, output_format, cache_keys[i])
         except Exception as e:
-            logger.warning(f"PydanticOutputParser failed to parse extracted JSON: {e}")
-            logger.warning(f"Extracted JSON (first 500 chars): {json_text[:500]}")
-            logger.warning(f"Original response (first 500 chars): {response_text[:500]}")
+            _log_analysis_error(e)
             return None
-        
-        return {
-            "result": result,
-            "messages": messages
-        }
-        
+
+    finalized = await asyncio.gather(*(_finalize(i, st) for i, st in zip(pending, final_states)))
+    for i, item in zip(pending, finalized):
+        results[i] = item
+    return results
+
+
+def _parse_risk_item(parser: PydanticOutputParser, response_text: str, output_format: str) -> Optional[RiskItem]:
+    """按期望格式解析 RiskItem，失败时回退到另一种格式。"""
+    if output_format == "yaml":
+        return _parse_yaml_result(response_text) or _parse_json_result(parser, response_text)
+    return _parse_json_result(parser, response_text) or _parse_yaml_result(response_text)
+
+
+def _parse_json_result(parser: PydanticOutputParser, response_text: str) -> Optional[RiskItem]:
+    """从响应文本中提取 JSON 并解析为 RiskItem。"""
+    # 提取与解析一次完成，直接校验解析结果，不再让 parser 重新解析 JSON 字符串
+    data = load_json_from_text(response_text)
+    if not isinstance(data, dict):
+        return None
+    try:
+        return parser.pydantic_object.model_validate(data)
+    except Exception as e:
+        logger.warning(f"PydanticOutputParser failed to parse extracted JSON: {e}")
+        logger.warning(f"Extracted JSON (first 500 chars): {str(data)[:500]}")
+        return None
+
+
+def _parse_yaml_result(response_text: str) -> Optional[RiskItem]:
+    """从响应文本中提取 YAML 映射并校验为 RiskItem。"""
+    data = load_yaml_mapping(response_text)
+    if data is None:
+        return None
+    try:
+        return RiskItem.model_validate(data)
     except Exception as e:
-        import traceback
-        error_msg = str(e) if str(e) else type(e).__name__
-        error_traceback = traceback.format_exception(type(e), e, e.__traceback__)
-        logger.error(f"Error running expert analysis: {error_msg}")
-        logger.error(f"Traceback:\n{''.join(error_traceback)}")
+        logger.warning(f"Failed to validate extracted YAML as RiskItem: {e}")
         return None
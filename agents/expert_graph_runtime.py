@@ -6,11 +6,18 @@ moving budget control, prompt construction, and history shrinking logic here.
 
 from __future__ import annotations
 
+import asyncio
+import hashlib
+import io
+import itertools
 import json
 import logging
+import math
 import os
-from dataclasses import dataclass
-from typing import Any, Dict, List, Optional
+from collections import deque
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, Callable, Deque, Dict, List, Optional, Sequence, Tuple
 
 from langchain_core.language_models import BaseChatModel
 from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, SystemMessage, ToolMessage
@@ -18,7 +25,9 @@ from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, System
 from agents.prompts import render_prompt_template
 from core.config import Config
 from core.state import ExpertState, RiskItem
-from util.json_utils import extract_json_from_text
+from util.json_utils import load_json_from_text
+from util.llm_cache import disk_cache_enabled, llm_cache_key, load_cached_message, save_cached_message
+from util.yaml_utils import load_yaml_mapping
 from util.console_utils import vprint
 
 logger = logging.getLogger(__name__)
@@ -31,14 +40,10 @@ def _safe_float(v: Any, default: float) -> float:
 
 
 def _clamp_riskitem_json(text: str, *, clamp_confidence: float) -> Optional[str]:
-    """Best-effort: extract JSON and clamp confidence (keeping JSON-only output)."""
-    json_text = extract_json_from_text(text or "")
-    if not json_text:
-        return None
-    try:
-        data = json.loads(json_text)
-    except Exception:
-        return None
+    """Best-effort: extract JSON (or YAML) and clamp confidence (keeping JSON-only output)."""
+    data = load_json_from_text(text or "")
+    if data is None:
+        data = load_yaml_mapping(text or "")
     if not isinstance(data, dict):
         return None
 
@@ -49,6 +54,119 @@ def _clamp_riskitem_json(text: str, *, clamp_confidence: float) -> Optional[str]
 
     return json.dumps(data, ensure_ascii=False)
 
+
+# Tiered round budget (fractions of `max_expert_rounds`): nudge the model to wrap up,
+# then drop tool bindings, and finally strip tool calls and clamp confidence.
+BUDGET_TIER_NONE = 0
+BUDGET_TIER_WRAP_UP = 1
+BUDGET_TIER_NO_TOOLS = 2
+BUDGET_TIER_FINAL = 3
+_BUDGET_TIER_RATIOS: Tuple[Tuple[int, float], ...] = (
+    (BUDGET_TIER_FINAL, 0.95),
+    (BUDGET_TIER_NO_TOOLS, 0.85),
+    (BUDGET_TIER_WRAP_UP, 0.65),
+)
+
+
+def round_budget_tier(current_round: int, max_rounds: int) -> int:
+    """Map the current reasoner round onto a budget tier."""
+    if current_round > max_rounds:
+        return BUDGET_TIER_FINAL
+    for tier, ratio in _BUDGET_TIER_RATIOS:
+        if current_round >= max(1, math.ceil(max_rounds * ratio)):
+            return tier
+    return BUDGET_TIER_NONE
+
+
+def make_reasoner_cache_key(
+    model_id: str,
+    format_instructions: str,
+    available_tools_text: str,
+) -> Callable[[ExpertState], str]:
+    """Build the cache key function for one graph's `reasoner` node.
+
+    The key covers everything the reasoner's prompt is rendered from: the model, the
+    output format instructions, the tool list, the full risk item, the diff and file
+    content, and the whole message history. Two states share a key only if the LLM
+    would see the same input.
+    """
+    graph_parts = (model_id, format_instructions, available_tools_text)
+
+    def reasoner_cache_key(state: ExpertState) -> str:
+        h = hashlib.sha256()
+
+        def _add(part: str) -> None:
+            h.update(part.encode("utf-8", errors="surrogatepass"))
+            h.update(b"\x1f")
+
+        for part in graph_parts:
+            _add(part)
+        risk_context = state.get("risk_context")
+        _add(risk_context.model_dump_json() if risk_context is not None else "")
+        _add(state.get("diff_context") or "")
+        _add(state.get("file_content") or "")
+        for message in state.get("messages", []) or []:
+            content = getattr(message, "content", "")
+            _add(getattr(message, "type", ""))
+            _add(content if isinstance(content, str) else repr(content))
+            tool_calls = getattr(message, "tool_calls", None)
+            if tool_calls:
+                _add(repr(tool_calls))
+        return h.hexdigest()
+
+    return reasoner_cache_key
+
+
+def output_format_label(output_format: str) -> str:
+    """Format name used in prompt wording ("YAML" or "JSON"), matching the format instructions."""
+    return "YAML" if (output_format or "").strip().lower() == "yaml" else "JSON"
+
+
+@lru_cache(maxsize=64)
+def _render_cached(template_name: str, risk_type: str, available_tools: str, output_format: str) -> str:
+    """Memoized expert template rendering; inputs are constant per graph instance."""
+    if template_name == "expert_generic":
+        return render_prompt_template(
+            template_name,
+            risk_type=risk_type,
+            available_tools=available_tools,
+            output_format=output_format,
+        )
+    return render_prompt_template(
+        template_name,
+        risk_type=risk_type,
+        available_tools=available_tools,
+        output_format=output_format,
+        validation_logic_examples="",
+    )
+
+
+@lru_cache(maxsize=64)
+def _persistent_system_prompt(
+    risk_type_str: str,
+    available_tools_text: str,
+    format_instructions: str,
+    output_format: str,
+) -> str:
+    """Render the stable system prefix for a risk type (memoized; byte-identical across calls)."""
+    try:
+        base_system_prompt = _render_cached(
+            f"expert_{risk_type_str}", risk_type_str, available_tools_text, output_format
+        )
+    except FileNotFoundError:
+        base_system_prompt = _render_cached("expert_generic", risk_type_str, available_tools_text, output_format)
+    return f"""{base_system_prompt}
+            ## 输出格式要求
+            {format_instructions}
+            """
+
+
+def _prompt_cache_control_enabled() -> bool:
+    """Emit content blocks with `cache_control` (set EXPERT_PROMPT_CACHE_CONTROL=1; provider must accept block content)."""
+    val = os.environ.get("EXPERT_PROMPT_CACHE_CONTROL", "").strip().lower()
+    return val in {"1", "true", "yes", "y", "on"}
+
+
 def log_http_error_details(err: Exception, *, max_body_chars: int = 4000) -> None:
     """Best-effort logging for provider HTTP errors (e.g. httpx.HTTPStatusError)."""
     try:
@@ -88,6 +206,26 @@ def log_http_error_details(err: Exception, *, max_body_chars: int = 4000) -> Non
         return
 
 
+def _env_int(name: str, default: int) -> int:
+    v = (os.getenv(name) or "").strip()
+    if not v:
+        return int(default)
+    try:
+        return int(v)
+    except Exception:
+        return int(default)
+
+
+def history_limits_from_env() -> Dict[str, int]:
+    """Read the EXPERT_MAX_* history budget env vars once (clamped to sane minimums)."""
+    return {
+        "max_history": max(1, _env_int("EXPERT_MAX_HISTORY_MESSAGES", 16)),
+        "max_total_chars": max(10_000, _env_int("EXPERT_MAX_TOTAL_CHARS", 80000)),
+        "max_tool_chars": max(500, _env_int("EXPERT_MAX_TOOL_CHARS", 6000)),
+        "max_ai_chars": max(500, _env_int("EXPERT_MAX_AI_CHARS", 12000)),
+    }
+
+
 @dataclass(frozen=True)
 class ExpertGraphRuntime:
     llm_raw: BaseChatModel
@@ -96,6 +234,34 @@ class ExpertGraphRuntime:
     tools_enabled: bool
     available_tools_text: str
     format_instructions: str
+    # Format name used in the prompt wording ("JSON" or "YAML"); must agree with `format_instructions`.
+    output_format: str = "JSON"
+    # History budget, resolved once at graph-build time (see `history_limits_from_env`).
+    max_history: int = 16
+    max_total_chars: int = 80000
+    max_tool_chars: int = 6000
+    max_ai_chars: int = 12000
+    # Per-risk-item prompt tail, reused across reasoner rounds of the same task.
+    _task_block_cache: Dict[Any, str] = field(default_factory=dict, compare=False, repr=False)
+    # Optional limiter shared across expert groups; held only for the duration of an LLM call,
+    # so tool execution of one analysis never blocks another analysis' request.
+    llm_semaphore: Optional[asyncio.Semaphore] = field(default=None, compare=False, repr=False)
+
+    async def _ainvoke(self, llm: BaseChatModel, messages: List[BaseMessage]) -> BaseMessage:
+        # Byte-identical requests (CI re-runs of the same PR) are served from the disk cache.
+        cache_key = llm_cache_key(llm, messages) if disk_cache_enabled(llm) else None
+        if cache_key is not None:
+            cached = await load_cached_message(cache_key)
+            if cached is not None:
+                return cached
+        if self.llm_semaphore is None:
+            response = await llm.ainvoke(messages)
+        else:
+            async with self.llm_semaphore:
+                response = await llm.ainvoke(messages)
+        if cache_key is not None:
+            await save_cached_message(cache_key, response)
+        return response
 
     async def reasoner(self, state: ExpertState) -> ExpertState:
         """推理节点：调用 LLM 进行分析。"""
@@ -111,33 +277,38 @@ class ExpertGraphRuntime:
         # Enable by setting CR_VERBOSE=1.
         vprint(f"  🔍 [专家分析] 第 {current_round} 轮 | [{risk_type_str}] {risk_context.file_path}:{line_start}-{line_end}")
 
-        system_msg = self.build_system_message(risk_context, risk_type_str, file_content, diff_context)
-
         max_rounds = self.config.system.max_expert_rounds if self.config else 20
-        circuit_breaker_result = await self.handle_circuit_breaker(
-            [*messages],
-            current_round,
-            max_rounds,
-            risk_context,
-        )
-        if circuit_breaker_result is not None:
-            return circuit_breaker_result
+        tier = round_budget_tier(current_round, int(max_rounds))
 
         max_tool_calls = self.config.system.max_expert_tool_calls if self.config else 6
-        tool_budget_result = await self.handle_tool_budget([*messages], int(max_tool_calls), risk_context)
-        if tool_budget_result is not None:
-            return tool_budget_result
+        if tier < BUDGET_TIER_NO_TOOLS:
+            tool_budget_result = await self.handle_tool_budget(messages, int(max_tool_calls), risk_context)
+            if tool_budget_result is not None:
+                return tool_budget_result
+
+        # Template rendering (file IO on first use) and file-window slicing are synchronous;
+        # run them off the event loop so concurrent expert analyses keep overlapping.
+        system_msg = await asyncio.to_thread(
+            self.build_system_message, risk_context, risk_type_str, file_content, diff_context
+        )
+        if tier >= BUDGET_TIER_NO_TOOLS:
+            return await self.finalize_without_tools(
+                system_msg, messages, current_round, int(max_rounds), tier, risk_context
+            )
 
         if not messages:
             user_msg = HumanMessage(
-                content="请分析上述风险项。如果需要更多信息，请调用工具。分析完成后，请输出最终的 JSON 结果。"
+                content=f"请分析上述风险项。如果需要更多信息，请调用工具。分析完成后，请输出最终的 {self.output_format} 结果。"
             )
             new_messages = [system_msg, user_msg]
         else:
-            new_messages = [system_msg, *self.shrink_history([*messages])]
+            new_messages = [system_msg, *self.shrink_history(messages)]
+        if tier >= BUDGET_TIER_WRAP_UP:
+            # Appended last so the cached system/history prefix stays byte-identical.
+            new_messages.append(self.build_wrap_up_notice(current_round, int(max_rounds)))
 
         try:
-            response = await self.llm_for_reasoner.ainvoke(new_messages)
+            response = await self._ainvoke(self.llm_for_reasoner, new_messages)
         except Exception as e:
             log_http_error_details(e)
             raise
@@ -183,7 +354,7 @@ class ExpertGraphRuntime:
             return SystemMessage(content=content)
         return msg
 
-    def shrink_history(self, messages: List[BaseMessage]) -> List[BaseMessage]:
+    def shrink_history(self, messages: Sequence[BaseMessage]) -> List[BaseMessage]:
         """Hard budget for LLM context: cap history length + truncate oversized payloads.
 
         Notes:
@@ -191,27 +362,10 @@ class ExpertGraphRuntime:
         - Keep message ordering valid: never start with ToolMessage; include the assistant tool-call
           message that precedes trailing ToolMessage blocks when possible.
         """
-        try:
-            max_history = int(os.environ.get("EXPERT_MAX_HISTORY_MESSAGES", "16"))
-        except Exception:
-            max_history = 16
-        try:
-            max_total_chars = int(os.environ.get("EXPERT_MAX_TOTAL_CHARS", "80000"))
-        except Exception:
-            max_total_chars = 80000
-        try:
-            max_tool_chars = int(os.environ.get("EXPERT_MAX_TOOL_CHARS", "6000"))
-        except Exception:
-            max_tool_chars = 6000
-        try:
-            max_ai_chars = int(os.environ.get("EXPERT_MAX_AI_CHARS", "12000"))
-        except Exception:
-            max_ai_chars = 12000
-
-        max_history = max(1, max_history)
-        max_total_chars = max(10_000, max_total_chars)
-        max_tool_chars = max(500, max_tool_chars)
-        max_ai_chars = max(500, max_ai_chars)
+        max_history = self.max_history
+        max_total_chars = self.max_total_chars
+        max_tool_chars = self.max_tool_chars
+        max_ai_chars = self.max_ai_chars
 
         if not messages:
             return []
@@ -252,21 +406,23 @@ class ExpertGraphRuntime:
                 continue
             clipped.append(m)
 
-        def total_chars(msgs: List[BaseMessage]) -> int:
-            n = 0
-            for x in msgs:
-                cc = getattr(x, "content", "")
-                if isinstance(cc, str):
-                    n += len(cc)
-            return n
-
-        while len(clipped) > 1 and total_chars(clipped) > max_total_chars:
-            clipped.pop(0)
-            while clipped and isinstance(clipped[0], ToolMessage):
-                clipped.pop(0)
-        return clipped
-
-    def build_evidence_digest(self, messages: List[BaseMessage]) -> str:
+        # Sliding window over a running char total: drop oldest messages (and any ToolMessages
+        # orphaned at the head) until within budget, in a single linear pass.
+        window: Deque[Tuple[BaseMessage, int]] = deque()
+        total = 0
+        for m in clipped:
+            cc = getattr(m, "content", "")
+            n = len(cc) if isinstance(cc, str) else 0
+            window.append((m, n))
+            total += n
+
+        while len(window) > 1 and total > max_total_chars:
+            total -= window.popleft()[1]
+            while window and isinstance(window[0][0], ToolMessage):
+                total -= window.popleft()[1]
+        return [m for m, _ in window]
+
+    def build_evidence_digest(self, messages: Sequence[BaseMessage]) -> str:
         """Build a plain-text digest of recent evidence, avoiding ToolMessage roles in requests."""
         try:
             max_digest_chars = int(os.environ.get("EXPERT_MAX_EVIDENCE_DIGEST_CHARS", "16000"))
@@ -319,23 +475,46 @@ class ExpertGraphRuntime:
         file_content: str,
         diff_context: str,
     ) -> SystemMessage:
-        """构建系统提示词消息。"""
-        prompt_risk_type = (risk_type_str or "").strip()
-        try:
-            base_system_prompt = render_prompt_template(
-                f"expert_{prompt_risk_type}",
-                risk_type=prompt_risk_type,
-                available_tools=self.available_tools_text,
-                validation_logic_examples="",
-            )
-        except FileNotFoundError:
-            base_system_prompt = render_prompt_template(
-                "expert_generic",
-                risk_type=prompt_risk_type,
-                available_tools=self.available_tools_text,
-            )
+        """构建系统提示词消息。
 
-        system_content = f"""{base_system_prompt}
+        拆分为两段：按风险类型记忆化的持久前缀（基础提示词 + 工具说明 + 输出格式要求），
+        以及每个风险项的尾部（任务锚点 + diff + 文件窗口）。持久前缀在同一风险类型的
+        所有轮次/任务间字节一致，便于命中 provider 的前缀缓存；尾部在同一任务的多轮间复用。
+        """
+        persistent_content = _persistent_system_prompt(
+            (risk_type_str or "").strip(),
+            self.available_tools_text,
+            self.format_instructions,
+            self.output_format,
+        )
+
+        cache_key = (
+            risk_context.risk_type.value,
+            risk_context.file_path,
+            tuple(risk_context.line_number),
+            risk_context.description,
+            diff_context,
+            file_content,
+        )
+        task_block = self._task_block_cache.get(cache_key)
+        if task_block is None:
+            task_block = self._build_task_block(risk_context, file_content, diff_context)
+            self._task_block_cache[cache_key] = task_block
+        logger.debug(
+            f"Expert system prompt: {len(persistent_content)} cached prefix chars + {len(task_block)} task chars"
+        )
+
+        if _prompt_cache_control_enabled():
+            # Anthropic 风格的显式缓存标记：仅持久前缀参与缓存，尾部每次变化。
+            return SystemMessage(content=[
+                {"type": "text", "text": persistent_content, "cache_control": {"type": "ephemeral"}},
+                {"type": "text", "text": task_block},
+            ])
+        return SystemMessage(content=persistent_content + task_block)
+
+    def _build_task_block(self, risk_context: RiskItem, file_content: str, diff_context: str) -> str:
+        """构建单个风险项的提示词尾部（任务锚点 + diff + 文件窗口）。"""
+        block = f"""
             ## 当前任务锚点
             风险类型: {risk_context.risk_type.value}
             文件路径: {risk_context.file_path}
@@ -348,7 +527,7 @@ class ExpertGraphRuntime:
             except Exception:
                 max_diff_chars = 12000
             max_diff_chars = max(1000, max_diff_chars)
-            system_content += f"""
+            block += f"""
             ## Diff 上下文（已截断）
             {self._truncate_text(diff_context, max_diff_chars)}"""
 
@@ -358,24 +537,21 @@ class ExpertGraphRuntime:
             except Exception:
                 start_line, end_line = 1, 1
             window = 200
-            lines = file_content.splitlines()
             lo = max(1, start_line - window)
-            hi = min(len(lines), end_line + window)
-            snippet = "\n".join(f"{i}: {lines[i-1]}" for i in range(lo, hi + 1))
+            # Only materialize the window lines; islice stops at EOF for short files.
+            with io.StringIO(file_content) as sio:
+                selected = [line.rstrip("\r\n") for line in itertools.islice(sio, lo - 1, end_line + window)]
+            hi = lo + len(selected) - 1
+            snippet = "\n".join(f"{lo + i}: {line}" for i, line in enumerate(selected))
 
-            system_content += f"""
+            block += f"""
             ## 文件内容（已截取窗口）
             下面仅提供与风险行号相关的局部窗口（{lo}-{hi}）。如需更多上下文，请优先使用 read_file_snippet 按行号范围读取（建议设置 max_lines 控制输出预算）。
 
             {snippet}"""
+        return block
 
-        system_content += f"""
-            ## 输出格式要求
-            {self.format_instructions}
-            """
-        return SystemMessage(content=system_content)
-
-    def _count_tool_messages(self, messages: List[BaseMessage]) -> int:
+    def _count_tool_messages(self, messages: Sequence[BaseMessage]) -> int:
         return sum(1 for m in messages if isinstance(m, ToolMessage))
 
     def _is_no_signal_tool_result(self, content: str) -> bool:
@@ -400,7 +576,7 @@ class ExpertGraphRuntime:
             return True
         return False
 
-    def _count_recent_no_signal_tools(self, messages: List[BaseMessage], *, window: int) -> int:
+    def _count_recent_no_signal_tools(self, messages: Sequence[BaseMessage], *, window: int) -> int:
         window = max(1, int(window))
         seen = 0
         n = 0
@@ -415,45 +591,51 @@ class ExpertGraphRuntime:
                 break
         return n
 
-    async def handle_circuit_breaker(
+    def _budget_clamp_confidence(self) -> float:
+        try:
+            return float(getattr(getattr(self.config, "system", None), "expert_confidence_clamp_on_budget_stop", 0.55))
+        except Exception:
+            return 0.55
+
+    def build_wrap_up_notice(self, current_round: int, max_rounds: int) -> HumanMessage:
+        """第一档预算：追加在请求末尾的收尾提示（不改动前缀，保留提示缓存）。"""
+        return HumanMessage(
+            content=(
+                f"⚠️ 分析轮次即将用尽（第 {current_round}/{max_rounds} 轮）。"
+                f"请只在确有必要时再调用工具，并尽快基于已有证据输出最终 {self.output_format} 结果。"
+            )
+        )
+
+    async def finalize_without_tools(
         self,
-        messages: List[BaseMessage],
+        system_msg: SystemMessage,
+        messages: Sequence[BaseMessage],
         current_round: int,
         max_rounds: int,
+        tier: int,
         risk_context: RiskItem,
-    ) -> Optional[Dict[str, Any]]:
-        """处理轮次熔断逻辑（物理熔断版本）。"""
-        if current_round <= max_rounds:
-            return None
+    ) -> Dict[str, Any]:
+        """第二/三档预算：本轮改用未绑定工具的模型直接给出最终结论。
 
-        logger.warning(f"Circuit breaker triggered: {current_round} rounds > {max_rounds} max rounds")
-        clamp_conf = 0.55
-        try:
-            clamp_conf = float(getattr(getattr(self.config, "system", None), "expert_confidence_clamp_on_budget_stop", 0.55))
-        except Exception:
-            clamp_conf = 0.55
-        force_stop_content = f"""⚠️ **紧急停止：分析轮次已达上限 ({current_round} > {max_rounds})**
-
-                **请立即停止调用任何工具！直接最终分析！**
+        替代原先的"物理熔断"（超限后额外再调用一次 LLM）：在预算耗尽前就把本轮
+        请求本身变为无工具调用，因此不会产生额外的往返。请求只包含 system/user
+        角色（证据以摘要形式内联），避免部分 provider 拒绝"无工具绑定 + 历史含工具消息"
+        的请求。到达最后一档时额外剥离 `tool_calls` 并钳制 confidence。
+        """
+        clamp_conf = self._budget_clamp_confidence()
+        final = tier >= BUDGET_TIER_FINAL
+        logger.warning(
+            f"Round budget tier {tier} reached: round {current_round}/{max_rounds}, finalizing without tools"
+        )
+        stop_content = f"""⚠️ **分析轮次即将用尽（第 {current_round}/{max_rounds} 轮），本轮已禁用工具**
 
-                请根据目前已收集到的信息，**直接输出最终的 JSON 结果**。
+                请根据目前已收集到的信息，**直接输出最终的 {self.output_format} 结果**。
                 即使信息不完整，也要基于现有证据给出判断。
-                如果无法给出可核验的代码证据（diff/代码窗口/工具输出），请将 `confidence <= {clamp_conf}`（建议更低），避免误报。
-
-                ## 当前任务锚点
-                风险类型: {risk_context.risk_type.value}
-                文件路径: {risk_context.file_path}
-                行号范围: {risk_context.line_number[0]}:{risk_context.line_number[1]}
-                描述: {risk_context.description}
+                如果无法给出可核验的代码证据（diff/代码窗口/工具输出），请将 `confidence <= {clamp_conf}`（建议更低），避免误报。"""
 
-                ## 输出格式要求（必须严格遵守）
-                {self.format_instructions}
-
-                **重要：你必须输出一个有效的 JSON 对象，格式必须完全符合上述要求。不要输出任何解释性文字，只输出 JSON。**"""
-
-        evidence = self.build_evidence_digest(self.shrink_history([*messages]))
+        evidence = self.build_evidence_digest(self.shrink_history(messages))
         if evidence:
-            force_stop_content += f"""
+            stop_content += f"""
 
                 ## 已有信息摘录（对话/工具输出）
                 以下是最近轮次中已获得的关键输出（已截断）。请优先基于这些信息完成最终判断。
@@ -461,14 +643,16 @@ class ExpertGraphRuntime:
                 {evidence}"""
 
         new_messages = [
-            SystemMessage(content=force_stop_content),
-            HumanMessage(content="请直接输出最终 JSON（不要调用工具，不要输出解释）。"),
+            system_msg,
+            HumanMessage(
+                content=stop_content + f"\n\n请直接输出最终 {self.output_format}（不要调用工具，不要输出解释）。"
+            ),
         ]
 
         try:
-            response = await self.llm_raw.ainvoke(new_messages)
+            response = await self._ainvoke(self.llm_raw, new_messages)
         except Exception as e:
-            logger.error(f"Circuit breaker fallback LLM call failed: {type(e).__name__}: {e}")
+            logger.error(f"No-tools finalization LLM call failed: {type(e).__name__}: {e}")
             fallback_json = {
                 "risk_type": risk_context.risk_type.value,
                 "file_path": risk_context.file_path,
@@ -478,11 +662,13 @@ class ExpertGraphRuntime:
                 "severity": "info",
                 "suggestion": None,
             }
-            return {"messages": [SystemMessage(content=json.dumps(fallback_json, ensure_ascii=False))]}
+            return {"messages": [AIMessage(content=json.dumps(fallback_json, ensure_ascii=False))]}
 
-        if hasattr(response, "tool_calls"):
-            response.tool_calls = []
-        clamped = _clamp_riskitem_json(getattr(response, "content", "") or "", clamp_confidence=clamp_conf)
+        content = getattr(response, "content", "") or ""
+        if not final and not getattr(response, "tool_calls", None):
+            return {"messages": [response]}
+
+        clamped = _clamp_riskitem_json(content if isinstance(content, str) else str(content), clamp_confidence=clamp_conf)
         if clamped:
             return {"messages": [AIMessage(content=clamped)]}
 
@@ -493,13 +679,13 @@ class ExpertGraphRuntime:
             "description": risk_context.description,
             "confidence": float(clamp_conf),
             "severity": "info",
-            "suggestion": "轮次熔断后未能提取有效 JSON；请手动复核该风险是否真实且可锚定到变更。",
+            "suggestion": f"轮次预算耗尽后未能提取有效 {self.output_format}；请手动复核该风险是否真实且可锚定到变更。",
         }
         return {"messages": [AIMessage(content=json.dumps(fallback_json, ensure_ascii=False))]}
 
     async def handle_tool_budget(
         self,
-        messages: List[BaseMessage],
+        messages: Sequence[BaseMessage],
         max_tool_calls: int,
         risk_context: RiskItem,
     ) -> Optional[Dict[str, Any]]:
@@ -535,7 +721,7 @@ class ExpertGraphRuntime:
         except Exception:
             clamp_conf = 0.55
         force_stop_content = f"""⚠️ **停止工具调用：{reason}**
-            请基于当前已掌握的信息直接完成最终判断并输出 JSON。
+            请基于当前已掌握的信息直接完成最终判断并输出 {self.output_format}。
             如果你无法在 diff/代码窗口/工具输出中指出可核验的证据点，请将 `confidence <= {clamp_conf}`（建议更低），避免把推断当作确认问题。
 
             ## 当前任务锚点
@@ -547,9 +733,9 @@ class ExpertGraphRuntime:
             ## 输出格式要求（必须严格遵守）
             {self.format_instructions}
 
-            **重要：你必须输出一个有效的 JSON 对象。不要输出任何解释性文字，只输出 JSON。**"""
+            **重要：你必须输出一个有效的 {self.output_format} 对象。不要输出任何解释性文字，只输出 {self.output_format}。**"""
 
-        evidence = self.build_evidence_digest(self.shrink_history([*messages]))
+        evidence = self.build_evidence_digest(self.shrink_history(messages))
         if evidence:
             force_stop_content += f"""
 
@@ -560,10 +746,10 @@ class ExpertGraphRuntime:
 
         new_messages = [
             SystemMessage(content=force_stop_content),
-            HumanMessage(content="请直接输出最终 JSON（不要调用工具，不要输出解释）。"),
+            HumanMessage(content=f"请直接输出最终 {self.output_format}（不要调用工具，不要输出解释）。"),
         ]
         try:
-            response = await self.llm_raw.ainvoke(new_messages)
+            response = await self._ainvoke(self.llm_raw, new_messages)
         except Exception as e:
             logger.error(f"Tool budget fallback LLM call failed: {type(e).__name__}: {e}")
             fallback_json = {
@@ -590,6 +776,6 @@ class ExpertGraphRuntime:
             "description": risk_context.description,
             "confidence": float(clamp_conf),
             "severity": "info",
-            "suggestion": "工具预算停止后未能提取有效 JSON；请手动复核该风险是否真实且可锚定到变更。",
+            "suggestion": f"工具预算停止后未能提取有效 {self.output_format}；请手动复核该风险是否真实且可锚定到变更。",
         }
         return {"messages": [AIMessage(content=json.dumps(fallback_json, ensure_ascii=False))]}
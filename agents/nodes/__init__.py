@@ -2,18 +2,21 @@
 
 This module contains all node implementations for the LangGraph workflow:
 - Intent Analysis Node: Map-Reduce pattern for analyzing file intents
+- File Prefetch Node: Reads changed files concurrently with intent analysis
 - Manager Node: Routes tasks to appropriate experts
 - Expert Execution Node: Parallel execution of expert agents with concurrency control
 - Reporter Node: Generates final review report
 """
 
 from agents.nodes.intent_analysis import intent_analysis_node
+from agents.nodes.file_prefetch import file_prefetch_node
 from agents.nodes.manager import manager_node
 from agents.nodes.expert_execution import expert_execution_node
 from agents.nodes.reporter import reporter_node
 
 __all__ = [
     "intent_analysis_node",
+    "file_prefetch_node",
     "manager_node",
     "expert_execution_node",
     "reporter_node",
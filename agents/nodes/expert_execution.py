@@ -12,8 +12,13 @@ from langchain_core.language_models import BaseChatModel
 from core.state import ReviewState, RiskItem, RiskType
 from core.llm_factory import create_chat_model
 from core.config import Config
-from agents.expert_graph import build_expert_graph, create_langchain_tools, run_expert_analysis
-from util.file_utils import read_file_content
+from agents.expert_graph import (
+    build_expert_graph,
+    create_langchain_tools,
+    expert_cache_scope,
+    run_expert_analyses_batch,
+)
+from util.file_utils import read_files_concurrently
 from util.diff_utils import extract_file_diff
 from util.expert_stats import build_tool_call_stats, count_ai_rounds, count_tool_messages
 from util.runtime_utils import elapsed_tag
@@ -142,8 +147,10 @@ async def expert_execution_node(state: ReviewState) -> Dict[str, Any]:
                 continue
 
     stats_payload = build_tool_call_stats(tool_stats_records) if tool_stats_records else build_tool_call_stats([])
-    metadata = dict(state.get("metadata") or {})
-    metadata["expert_tool_call_stats"] = stats_payload
+    # Only changed keys; the metadata reducer merges them into the workflow state.
+    metadata: Dict[str, Any] = {"expert_tool_call_stats": stats_payload}
+    if isinstance(expert_analyses, list):
+        metadata["expert_analyses"] = expert_analyses
     return {"expert_results": expert_results_dicts, "metadata": metadata}
 
 
@@ -189,6 +196,14 @@ async def run_expert_group(
             workspace_root=workspace_root,
             asset_key=asset_key
         )
+        
+        # 构建专家子图（无状态，同组任务共享；系统提示词在 reasoner 节点内部动态构建）
+        expert_graph = build_expert_graph(
+            llm=llm,
+            tools=langchain_tools,
+            config=config,
+            llm_semaphore=semaphore,
+        )
     except Exception as e:
         import traceback
         error_msg = str(e) if str(e) else type(e).__name__
@@ -197,73 +212,73 @@ async def run_expert_group(
         logger.error(f"Traceback:\n{''.join(error_traceback)}")
         raise  # 重新抛出异常，让外层捕获
     
-    # Process each task with concurrency control
-    async def process_task(task: RiskItem) -> Optional[RiskItem]:
-        """Process a single task with concurrency control using LangGraph subgraph."""
-        async with semaphore:
-            try:
-                # 读取文件内容
-                file_content = read_file_content(task.file_path, config) if config else ""
-                
-                # 构建专家子图（系统提示词在 reasoner 节点内部动态构建）
-                expert_graph = build_expert_graph(
-                    llm=llm,
-                    tools=langchain_tools,
-                    config=config
-                )
-                
-                # 运行专家分析子图
-                analysis_result = await run_expert_analysis(
-                    graph=expert_graph,
-                    risk_item=task,
-                    diff_context=extract_file_diff(diff_context, task.file_path),
-                    file_content=file_content,
-                    recursion_limit=max(100, int(config.system.max_expert_rounds) * 4),
-                )
-                
-                if not analysis_result:
-                    logger.warning(f"Failed to get result from expert analysis for {task.file_path}")
-                    return None
-                
-                # 结果已经是 RiskItem 对象
-                validated_item: RiskItem = analysis_result.get("result")
-                messages = analysis_result.get("messages", [])
-                
-                if not validated_item:
-                    logger.warning(f"Failed to get RiskItem result from expert analysis for {task.file_path}")
-                    return None
-                
-                # 记录专家分析日志（包含对话历史）
-                expert_analysis = {
-                    "file_path": task.file_path,
-                    "line_number": task.line_number,
-                    "risk_item": task.model_dump(),  # 原始风险项
-                    "result": validated_item.model_dump(),  # 分析结果（RiskItem 对象）
-                    "validated_item": validated_item.model_dump(),  # 验证后的风险项
-                    "messages": messages,  # 对话历史
-                    "tool_calls_used": count_tool_messages(messages),
-                    "ai_rounds_used": count_ai_rounds(messages),
-                }
-                
-                if "metadata" not in global_state:
-                    global_state["metadata"] = {}
-                if "expert_analyses" not in global_state["metadata"]:
-                    global_state["metadata"]["expert_analyses"] = []
-                global_state["metadata"]["expert_analyses"].append(expert_analysis)
-                
-                return validated_item
-                
-            except Exception as e:
-                import traceback
-                line_str = format_line_number(task.line_number)
-                error_msg = str(e) if str(e) else type(e).__name__
-                error_traceback = traceback.format_exception(type(e), e, e.__traceback__)
-                logger.error(f"Error processing risk item {task.file_path}:{line_str}: {error_msg}")
-                logger.error(f"Traceback:\n{''.join(error_traceback)}")
+    # 读取文件内容与 diff（优先复用预取结果；同一文件只读取一次，各文件在线程中并发读取）
+    prefetched: Dict[str, str] = global_state.get("file_contents") or {}
+    file_contents_by_path: Dict[str, str] = dict(prefetched)
+    missing_paths = [task.file_path for task in tasks if task.file_path not in prefetched]
+    if config and missing_paths:
+        file_contents_by_path.update(await read_files_concurrently(missing_paths, config))
+    for task in tasks:
+        file_contents_by_path.setdefault(task.file_path, "")
+    file_contents = [file_contents_by_path[task.file_path] for task in tasks]
+    diff_contexts = [extract_file_diff(diff_context, task.file_path) for task in tasks]
+    
+    # 批量运行专家分析（graph.abatch 一次提交；共享信号量在 LLM 调用处限制并发）
+    analysis_results = await run_expert_analyses_batch(
+        graph=expert_graph,
+        risk_items=tasks,
+        diff_contexts=diff_contexts,
+        file_contents=file_contents,
+        recursion_limit=max(100, int(config.system.max_expert_rounds) * 4),
+        output_format=config.system.expert_output_format,
+        cache_scope=expert_cache_scope(llm, config),
+    )
+    
+    def collect_result(task: RiskItem, analysis_result: Optional[dict]) -> Optional[RiskItem]:
+        """Record a single expert analysis result into global state metadata."""
+        try:
+            if not analysis_result:
+                logger.warning(f"Failed to get result from expert analysis for {task.file_path}")
+                return None
+            
+            # 结果已经是 RiskItem 对象
+            validated_item: RiskItem = analysis_result.get("result")
+            messages = analysis_result.get("messages", [])
+            
+            if not validated_item:
+                logger.warning(f"Failed to get RiskItem result from expert analysis for {task.file_path}")
                 return None
+            
+            # 记录专家分析日志（包含对话历史）
+            expert_analysis = {
+                "file_path": task.file_path,
+                "line_number": task.line_number,
+                "risk_item": task.model_dump(),  # 原始风险项
+                "result": validated_item.model_dump(),  # 分析结果（RiskItem 对象）
+                "validated_item": validated_item.model_dump(),  # 验证后的风险项
+                "messages": messages,  # 对话历史
+                "tool_calls_used": count_tool_messages(messages),
+                "ai_rounds_used": count_ai_rounds(messages),
+            }
+            
+            if "metadata" not in global_state:
+                global_state["metadata"] = {}
+            if "expert_analyses" not in global_state["metadata"]:
+                global_state["metadata"]["expert_analyses"] = []
+            global_state["metadata"]["expert_analyses"].append(expert_analysis)
+            
+            return validated_item
+            
+        except Exception as e:
+            import traceback
+            line_str = format_line_number(task.line_number)
+            error_msg = str(e) if str(e) else type(e).__name__
+            error_traceback = traceback.format_exception(type(e), e, e.__traceback__)
+            logger.error(f"Error processing risk item {task.file_path}:{line_str}: {error_msg}")
+            logger.error(f"Traceback:\n{''.join(error_traceback)}")
+            return None
     
-    # Process all tasks concurrently (with semaphore limiting)
-    results = await asyncio.gather(*[process_task(task) for task in tasks])
+    results = [collect_result(task, r) for task, r in zip(tasks, analysis_results)]
     
     # Filter out None results (errors)
     validated_results = [r for r in results if r is not None]
@@ -0,0 +1,51 @@
+"""代码审查工作流的文件预取节点。
+
+与 Intent Analysis 并行执行（LangGraph 扇出分支）：变更文件内容只依赖 `changed_files`，
+不依赖任何 LLM 输出，因此可以在意图分析等待 LLM 响应时提前读取，供专家执行阶段直接复用。
+"""
+
+import logging
+import os
+from typing import Any, Dict
+
+from core.state import ReviewState
+from util.file_utils import read_files_concurrently
+
+logger = logging.getLogger(__name__)
+
+
+def _env_number(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, str(default)))
+    except ValueError:
+        return float(default)
+
+
+async def file_prefetch_node(state: ReviewState) -> Dict[str, Any]:
+    """并发读取所有变更文件内容。
+
+    仅在逐文件意图分析模式下预取；chunked 模式面向超大 PR，专家阶段只会用到少量文件，
+    此时仍按需读取，避免把整批文件内容放进工作流状态。读取超时或失败时返回已读取的部分，
+    缺失的文件由专家阶段回退为按需读取。
+
+    读取由并发上限（FILE_READ_CONCURRENCY，默认 8）与总字符预算
+    （FILE_PREFETCH_MAX_CHARS，默认 4,000,000）约束，而不是固定的文件数上限。
+
+    Returns:
+        包含 'file_contents' 键的字典（文件路径 -> 文件内容）。
+    """
+    meta = state.get("metadata") or {}
+    config = meta.get("config")
+    changed_files = state.get("changed_files", []) or []
+    if not config or not changed_files or meta.get("intent_mode") == "chunked":
+        return {"file_contents": {}}
+
+    file_contents = await read_files_concurrently(
+        changed_files,
+        config,
+        concurrency=int(_env_number("FILE_READ_CONCURRENCY", 8)),
+        max_total_chars=int(_env_number("FILE_PREFETCH_MAX_CHARS", 4_000_000)),
+        timeout=max(1.0, _env_number("FILE_PREFETCH_TIMEOUT_SECONDS", 30)),
+    )
+    logger.info(f"Prefetched {len(file_contents)}/{len(set(changed_files))} changed files")
+    return {"file_contents": file_contents}
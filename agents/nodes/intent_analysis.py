@@ -6,7 +6,6 @@
 
 import asyncio
 import logging
-import json
 import re
 import os
 from typing import Dict, Any
@@ -17,11 +16,17 @@ from core.state import ReviewState, FileAnalysis, RiskItem, RiskType
 from agents.prompts import render_prompt_template
 from util.diff_utils import generate_context_text_for_file, extract_file_diff
 from util.file_utils import read_file_content
-from util.json_utils import extract_json_from_text
+from util.json_utils import load_json_from_text
+from util.llm_cache import disk_cache_enabled, llm_cache_key, load_cached_response, model_identity, save_cached_response
+from util.semantic_cache import semantic_lookup, semantic_store
 from util.runtime_utils import elapsed_tag
 
 logger = logging.getLogger(__name__)
 
+# FileAnalysis 解析器与格式说明（无状态，模块级构建一次，避免每个文件重复生成 schema）
+_FILE_ANALYSIS_PARSER = PydanticOutputParser(pydantic_object=FileAnalysis)
+_FILE_ANALYSIS_FORMAT_INSTRUCTIONS = _FILE_ANALYSIS_PARSER.get_format_instructions()
+
 def _normalize_line_number(v: Any) -> Any:
     """Best-effort normalization to [start, end] for RiskItem parsing."""
     if v is None:
@@ -112,20 +117,28 @@ async def intent_analysis_node(state: ReviewState) -> Dict[str, Any]:
                     file_content=file_content
                 )
                 
-                parser = PydanticOutputParser(pydantic_object=FileAnalysis)
-                
                 # 创建消息列表（直接使用已渲染的文本，并添加格式说明）
                 messages = [
                     SystemMessage(content="You are an expert code reviewer analyzing file changes."),
-                    HumanMessage(content=rendered_prompt + "\n\n" + parser.get_format_instructions())
+                    HumanMessage(content=rendered_prompt + "\n\n" + _FILE_ANALYSIS_FORMAT_INSTRUCTIONS)
                 ]
                 
                 # 使用 LCEL 语法：messages -> llm -> parser
+                # 同一 PR 状态重复运行（CI 重跑）时提示词完全相同，命中磁盘缓存直接复用响应
+                cache_key = llm_cache_key(llm, messages) if disk_cache_enabled(llm) else None
+                cached_text = await load_cached_response(cache_key) if cache_key else None
+                # 精确缓存未命中时，查找同一文件近似提示词（仅空白/琐碎改动不同）的响应
+                semantic_scope = f"{model_identity(llm)}|{file_path}"
+                if cache_key and cached_text is None:
+                    cached_text = await semantic_lookup(semantic_scope, rendered_prompt)
                 response_text = ""
                 try:
-                    # Avoid per-call temperature overrides for provider compat; rely on model config.
-                    response = await llm.ainvoke(messages)
-                    response_text = response.content if hasattr(response, "content") else str(response)
+                    if cached_text is not None:
+                        response_text = cached_text
+                    else:
+                        # Avoid per-call temperature overrides for provider compat; rely on model config.
+                        response = await llm.ainvoke(messages)
+                        response_text = response.content if hasattr(response, "content") else str(response)
                 except Exception as e:
                     # LLM 调用失败：回退到文本解析（通常为 provider 错误/余额不足等）
                     logger.warning(
@@ -135,9 +148,16 @@ async def intent_analysis_node(state: ReviewState) -> Dict[str, Any]:
                     response_text = str(e) if str(e) else type(e).__name__
 
                 try:
-                    # Some providers/models may wrap JSON in markdown or add preamble; extract JSON first.
-                    json_text = extract_json_from_text(response_text) or response_text
-                    file_analysis: FileAnalysis = parser.parse(json_text)
+                    # Some providers/models may wrap JSON in markdown or add preamble; extract and
+                    # parse once, then validate the parsed object (no second JSON parse).
+                    data = load_json_from_text(response_text)
+                    if data is None:
+                        file_analysis: FileAnalysis = _FILE_ANALYSIS_PARSER.parse(response_text)
+                    else:
+                        file_analysis = FileAnalysis.model_validate(data)
+                    if cache_key and cached_text is None:
+                        await save_cached_response(cache_key, response_text)
+                        await semantic_store(semantic_scope, rendered_prompt, response_text)
                 except Exception as e:
                     # 解析失败：回退到文本解析
                     logger.warning(f"PydanticOutputParser failed for {file_path}, falling back to text parsing: {e}")
@@ -182,8 +202,9 @@ def _parse_intent_analysis_response(response: str, file_path: str) -> FileAnalys
     """解析 LLM 响应为 FileAnalysis 对象（PydanticOutputParser 失败时的回退方案）。"""
     try:
         try:
-            json_text = extract_json_from_text(response) or ""
-            data = json.loads(json_text) if json_text else {}
+            data = load_json_from_text(response)
+            if not isinstance(data, dict):
+                data = {}
             intent_summary = data.get("intent_summary", response[:500])
             potential_risks_data = data.get("potential_risks", [])
             complexity_score = data.get("complexity_score")
@@ -11,13 +11,13 @@ very large diffs. It avoids per-file LLM calls by:
 from __future__ import annotations
 
 import asyncio
-import json
 import logging
 import math
 import os
 import random
 import re
 from dataclasses import dataclass
+from itertools import islice
 from typing import Any, Dict, List, Optional, Sequence, Tuple
 
 from langchain_core.language_models import BaseChatModel
@@ -28,7 +28,8 @@ from pydantic import BaseModel, Field
 from agents.prompts import render_prompt_template
 from core.state import FileAnalysis, ReviewState
 from util.diff_utils import extract_file_diff, parse_diff_with_line_numbers
-from util.json_utils import extract_json_from_text
+from util.json_utils import load_json_from_text
+from util.llm_cache import disk_cache_enabled, llm_cache_key, load_cached_response, save_cached_response
 from util.runtime_utils import elapsed_seconds, elapsed_tag
 
 logger = logging.getLogger(__name__)
@@ -89,9 +90,15 @@ _DANGER_RE = re.compile(
 )
 
 
+_TEST_FILE_SUFFIXES = ("_test.py", ".spec.ts", ".spec.tsx")
+
+# One match per added line ("+..." at line start) that declares public API; scanned in a single pass.
+_PUBLIC_API_LINE_RE = re.compile(r"^\+.*?\b(?:export|public|def|class|interface|type)\b", re.MULTILINE)
+
+
 def _file_type_weight(file_path: str) -> float:
     p = _normalize_path(file_path).lower()
-    if "/test" in p or p.startswith("tests/") or p.endswith("_test.py") or p.endswith(".spec.ts") or p.endswith(".spec.tsx"):
+    if "/test" in p or p.startswith("tests/") or p.endswith(_TEST_FILE_SUFFIXES):
         return 0.4
     if p.endswith((".md", ".rst", ".txt")):
         return 0.2
@@ -103,16 +110,7 @@ def _file_type_weight(file_path: str) -> float:
 def _public_api_delta(diff_text: str) -> int:
     if not diff_text:
         return 0
-    hits = 0
-    for line in diff_text.splitlines():
-        if not line.startswith("+"):
-            continue
-        s = line[1:]
-        if re.search(r"\b(export|public|def|class|interface|type)\b", s):
-            hits += 1
-            if hits >= 6:
-                break
-    return hits
+    return sum(1 for _ in islice(_PUBLIC_API_LINE_RE.finditer(diff_text), 6))
 
 
 def _count_diff_danger_hits(diff_text: str) -> Tuple[int, bool]:
@@ -162,6 +160,11 @@ class ChunkedIntentResponse(BaseModel):
     file_analyses: List[FileAnalysis] = Field(default_factory=list)
 
 
+# Stateless; built once so schema generation is not repeated for every chunk.
+_CHUNK_PARSER = PydanticOutputParser(pydantic_object=ChunkedIntentResponse)
+_CHUNK_FORMAT_INSTRUCTIONS = _CHUNK_PARSER.get_format_instructions()
+
+
 def _build_file_entries(diff_context: str, changed_files: Sequence[str]) -> List[FileEntry]:
     # Parse diff once for line-number-based stats.
     contexts_raw = parse_diff_with_line_numbers(diff_context)
@@ -333,21 +336,12 @@ def _select_topk_chunks(chunks: Sequence[Chunk]) -> Tuple[List[Chunk], List[Chun
 
 
 def _parse_chunk_response(text: str) -> Optional[ChunkedIntentResponse]:
-    parser = PydanticOutputParser(pydantic_object=ChunkedIntentResponse)
-    try:
-        return parser.parse(text)
-    except Exception:
-        pass
-
-    json_text = extract_json_from_text(text or "")
-    if not json_text:
-        return None
-    try:
-        data = json.loads(json_text)
-    except Exception:
+    # Extract + parse once, then validate the parsed object directly.
+    data = load_json_from_text(text or "")
+    if not isinstance(data, dict):
         return None
     try:
-        return ChunkedIntentResponse(**data)
+        return ChunkedIntentResponse.model_validate(data)
     except Exception:
         return None
 
@@ -387,21 +381,22 @@ async def intent_analysis_chunked_node(state: ReviewState) -> Dict[str, Any]:
     chunks = _pack_chunks(entries, max_chunk_chars=max_chunk_chars, max_file_diff_chars=max_file_diff_chars)
     selected, skipped = _select_topk_chunks(chunks)
 
-    meta = dict(state.get("metadata") or {})
-    meta["intent_mode"] = "chunked"
-    meta["intent_chunk_depth"] = 2
-    meta["intent_chunk_max_chars"] = int(max_chunk_chars)
-    meta["intent_chunk_topk_selected"] = [c.chunk_id for c in selected]
-    meta["intent_chunk_topk_skipped"] = [c.chunk_id for c in skipped]
-    meta["intent_chunk_total"] = int(len(chunks))
-    meta["intent_chunk_selected"] = int(len(selected))
+    # Only the keys this node changes; the metadata reducer merges them into state.
+    meta: Dict[str, Any] = {
+        "intent_mode": "chunked",
+        "intent_chunk_depth": 2,
+        "intent_chunk_max_chars": int(max_chunk_chars),
+        "intent_chunk_topk_selected": [c.chunk_id for c in selected],
+        "intent_chunk_topk_skipped": [c.chunk_id for c in skipped],
+        "intent_chunk_total": int(len(chunks)),
+        "intent_chunk_selected": int(len(selected)),
+    }
 
     print(f"  📦 chunks: {len(selected)}/{len(chunks)} selected (max_chars={max_chunk_chars})")
     if skipped:
         print(f"  ⏭️  skipped chunks: {len(skipped)}")
 
     semaphore = asyncio.Semaphore(max_concurrent)
-    parser = PydanticOutputParser(pydantic_object=ChunkedIntentResponse)
 
     async def analyze_chunk(chunk: Chunk) -> List[FileAnalysis]:
         async with semaphore:
@@ -419,19 +414,25 @@ async def intent_analysis_chunked_node(state: ReviewState) -> Dict[str, Any]:
             )
             messages = [
                 SystemMessage(content="You are an expert code reviewer analyzing PR diffs."),
-                HumanMessage(content=prompt + "\n\n" + parser.get_format_instructions()),
+                HumanMessage(content=prompt + "\n\n" + _CHUNK_FORMAT_INSTRUCTIONS),
             ]
-            try:
-                response = await llm.ainvoke(messages, temperature=0.3)
-            except Exception as e:
-                logger.error(f"Chunk LLM call failed ({chunk.chunk_id}): {type(e).__name__}: {e}")
-                return []
+            cache_key = llm_cache_key(llm, messages, temperature=0.3) if disk_cache_enabled(llm, temperature=0.3) else None
+            text = await load_cached_response(cache_key) if cache_key else None
+            from_cache = text is not None
+            if text is None:
+                try:
+                    response = await llm.ainvoke(messages, temperature=0.3)
+                except Exception as e:
+                    logger.error(f"Chunk LLM call failed ({chunk.chunk_id}): {type(e).__name__}: {e}")
+                    return []
+                text = response.content if hasattr(response, "content") else str(response)
 
-            text = response.content if hasattr(response, "content") else str(response)
             parsed = _parse_chunk_response(text)
             if not parsed:
                 logger.warning(f"Failed to parse chunk response: {chunk.chunk_id}")
                 return []
+            if cache_key and not from_cache:
+                await save_cached_response(cache_key, text)
 
             allowed = {f.file_path for f in chunk.files}
             out: List[FileAnalysis] = []
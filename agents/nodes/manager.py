@@ -4,6 +4,7 @@
 使用 LCEL 语法和 PydanticOutputParser。
 """
 
+import json
 import logging
 import re
 from bisect import bisect_left
@@ -352,8 +353,6 @@ def _format_work_list(work_list: List[Any]) -> str:
 
 def _get_expanded_format_instructions(parser: PydanticOutputParser) -> str:
     """生成扩展的格式说明（包含嵌套模型结构）。"""
-    import json
-    
     # Get the JSON schema from the Pydantic model
     schema = WorkListResponse.model_json_schema()
     
@@ -15,6 +15,9 @@ PROMPTS_DIR = Path(__file__).parent
 # Cache for loaded templates
 _template_cache: dict[str, PromptTemplate] = {}
 
+# Raw template text, used by render_prompt_template for a direct str.format_map
+_template_text_cache: dict[str, str] = {}
+
 
 def load_prompt_template(template_name: str) -> PromptTemplate:
     """Load a prompt template from file using LangChain's PromptTemplate.
@@ -66,10 +69,15 @@ def render_prompt_template(template_name: str, **kwargs) -> str:
         FileNotFoundError: If the template file doesn't exist.
         KeyError: If a required variable is missing from kwargs.
     """
-    template = load_prompt_template(template_name)
+    template_text = _template_text_cache.get(template_name)
+    if template_text is None:
+        # Loading through PromptTemplate keeps its validation of the f-string template
+        template_text = load_prompt_template(template_name).template
+        _template_text_cache[template_name] = template_text
     
-    # Use PromptTemplate's format method
-    return template.format(**kwargs)
+    # Same f-string semantics as PromptTemplate.format, without its per-call validation
+    # and input merging overhead
+    return template_text.format_map(kwargs)
 
 
 __all__ = ["load_prompt_template", "render_prompt_template", "PROMPTS_DIR"]
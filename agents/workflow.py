@@ -1,25 +1,32 @@
 """基于 LangGraph 的多智能体代码审查工作流。
 
 工作流结构：
+0. Intent Router：选择意图分析模式；空白/琐碎 diff 直接跳到 Reporter（不调用 LLM）
 1. Intent Analysis（Map-Reduce）：并行分析文件意图（或大 PR 降级为 chunked diff-only）
+   - File Prefetch：与意图分析并行读取变更文件内容，供专家阶段复用
 2. Manager：生成任务列表并按风险类型分组
 3. Expert Execution：并行执行专家组任务（并发控制）
 4. Reporter：生成最终报告
 """
 
+import asyncio
+import fnmatch
 import logging
+import os
+import threading
 from typing import Dict, Any, List, Optional
 from langgraph.graph import StateGraph, END
 from langgraph.checkpoint.memory import MemorySaver
 from langgraph.prebuilt import ToolNode
 from langchain_core.messages import HumanMessage
 from langchain_core.language_models import BaseChatModel
-from core.state import ReviewState
+from core.state import ReviewState, merge_metadata
 from core.llm_factory import create_chat_model
 from core.config import Config
 from tools.langchain_tools import create_tools_with_context
 from agents.nodes.intent_analysis_chunked import intent_analysis_chunked_node
 from agents.nodes.intent_analysis import intent_analysis_node
+from agents.nodes.file_prefetch import file_prefetch_node
 from agents.nodes.manager import manager_node
 from agents.nodes.expert_execution import expert_execution_node
 from agents.nodes.reporter import reporter_node
@@ -48,26 +55,106 @@ def _should_use_chunked_intent(state: ReviewState) -> bool:
     return (len(changed_files) >= file_threshold) or (len(diff_context) >= diff_chars_threshold)
 
 
+_DIFF_HEADER_PREFIXES = ("--- a/", "+++ b/", "--- /dev/null", "+++ /dev/null")
+
+# Extended git headers for changes that carry no +/- content lines (renames, copies,
+# binary files, created/deleted files, mode changes): always substantive.
+_STRUCTURAL_CHANGE_PREFIXES = (
+    "rename from ",
+    "rename to ",
+    "copy from ",
+    "copy to ",
+    "Binary files ",
+    "GIT binary patch",
+    "new file mode ",
+    "deleted file mode ",
+    "old mode ",
+    "new mode ",
+)
+
+
+def _has_substantive_changes(diff_context: str) -> bool:
+    """True unless the diff is empty or only touches blank lines / trailing whitespace.
+
+    Lines are compared in order per hunk, so reordered or moved code still counts as a change;
+    indentation is significant (Python). Renames, copies, binary, created/deleted files and mode
+    changes are substantive even though they have no content lines.
+    """
+    hunks: List[tuple] = []
+    added: List[str] = []
+    removed: List[str] = []
+    for line in diff_context.splitlines():
+        if line.startswith(_STRUCTURAL_CHANGE_PREFIXES):
+            return True
+        if line.startswith(("@@", "diff --git")):
+            hunks.append((added, removed))
+            added, removed = [], []
+            continue
+        if line[:1] not in ("+", "-") or line.startswith(_DIFF_HEADER_PREFIXES):
+            continue
+        content = line[1:].rstrip()
+        if content:
+            (added if line[0] == "+" else removed).append(content)
+    hunks.append((added, removed))
+    return any(a != r for a, r in hunks)
+
+
+def _trivial_skip_reason(state: ReviewState) -> Optional[str]:
+    """Deterministic fast path: PRs that need no LLM review at all.
+
+    - the diff is empty or only changes whitespace;
+    - every changed file matches REVIEW_SKIP_FILE_PATTERNS (comma-separated globs, e.g.
+      "tests/fixtures/*,*.lock"; empty by default).
+    """
+    if not _has_substantive_changes(state.get("diff_context", "") or ""):
+        return "trivial_diff"
+    patterns = [p.strip() for p in (os.getenv("REVIEW_SKIP_FILE_PATTERNS") or "").split(",") if p.strip()]
+    changed_files = state.get("changed_files", []) or []
+    if patterns and changed_files and all(
+        any(fnmatch.fnmatch(f, p) for p in patterns) for f in changed_files
+    ):
+        return "skip_patterns"
+    return None
+
+
 async def intent_router_node(state: ReviewState) -> ReviewState:
     """No-op node that records the intent mode decision into metadata."""
-    meta = dict(state.get("metadata") or {})
-    mode = "chunked" if _should_use_chunked_intent(state) else "per_file"
-    meta["intent_mode"] = mode
-    meta["intent_router"] = {
-        "changed_files": len(state.get("changed_files", []) or []),
-        "diff_chars": len(state.get("diff_context", "") or ""),
+    skip_reason = _trivial_skip_reason(state)
+    if skip_reason:
+        mode = "skip"
+    else:
+        mode = "chunked" if _should_use_chunked_intent(state) else "per_file"
+    meta = {
+        "intent_mode": mode,
+        "intent_router": {
+            "changed_files": len(state.get("changed_files", []) or []),
+            "diff_chars": len(state.get("diff_context", "") or ""),
+        },
     }
+    if skip_reason:
+        meta["skip_reason"] = skip_reason
+        print(f"  ⏭️  跳过 LLM 审查（{skip_reason}），直接生成报告")
+        logger.info(f"Skipping LLM review: {skip_reason}")
     return {"metadata": meta}
 
 
 def route_to_intent(state: ReviewState) -> str:
-    """Route to per-file intent or chunked diff-only intent based on PR size."""
+    """Route to per-file intent or chunked diff-only intent based on PR size (or straight to the reporter)."""
     mode = (state.get("metadata") or {}).get("intent_mode")
+    if mode == "skip":
+        return "reporter"
     if mode == "chunked":
         return "intent_analysis_chunked"
     return "intent_analysis"
 
 
+def route_to_prefetch(state: ReviewState) -> str:
+    """Fan-out to file prefetch unless the review is skipped."""
+    if (state.get("metadata") or {}).get("intent_mode") == "skip":
+        return END
+    return "file_prefetch"
+
+
 def create_multi_agent_workflow(
     config: Config,
     enable_checkpointing: bool = False
@@ -101,6 +188,7 @@ def create_multi_agent_workflow(
     workflow.add_node("intent_router", intent_router_node)
     workflow.add_node("intent_analysis", intent_analysis_node)
     workflow.add_node("intent_analysis_chunked", intent_analysis_chunked_node)
+    workflow.add_node("file_prefetch", file_prefetch_node)
     workflow.add_node("manager", manager_node)
     workflow.add_node("expert_execution", expert_execution_node)
     workflow.add_node("reporter", reporter_node)
@@ -116,12 +204,24 @@ def create_multi_agent_workflow(
         {
             "intent_analysis": "intent_analysis",
             "intent_analysis_chunked": "intent_analysis_chunked",
+            "reporter": "reporter",
         }
     )
 
-    # Intent Analysis -> Manager
+    # Intent Router -> File Prefetch (fan-out: runs in the same superstep as intent analysis)
+    workflow.add_conditional_edges(
+        "intent_router",
+        route_to_prefetch,
+        {
+            "file_prefetch": "file_prefetch",
+            END: END,
+        }
+    )
+
+    # Intent Analysis + File Prefetch -> Manager
     workflow.add_edge("intent_analysis", "manager")
     workflow.add_edge("intent_analysis_chunked", "manager")
+    workflow.add_edge("file_prefetch", "manager")
     
     # Manager -> Expert Execution or Reporter (conditional)
     workflow.add_conditional_edges(
@@ -180,6 +280,25 @@ def route_to_experts(state: ReviewState) -> str:
     return "expert_execution"
 
 
+_sync_loop: Optional[asyncio.AbstractEventLoop] = None
+_sync_loop_lock = threading.Lock()
+
+
+def _get_sync_loop() -> asyncio.AbstractEventLoop:
+    """Long-lived event loop on a daemon thread, used by the sync `invoke` wrapper.
+
+    The graph's nodes are coroutines; running them on one cached loop avoids creating a loop per
+    call and works even when the caller is itself inside a running event loop.
+    """
+    global _sync_loop
+    with _sync_loop_lock:
+        if _sync_loop is None:
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, name="workflow-sync-loop", daemon=True).start()
+            _sync_loop = loop
+    return _sync_loop
+
+
 def _wrap_workflow_with_dependencies(
     compiled_graph: Any,
     llm: BaseChatModel,
@@ -192,7 +311,6 @@ def _wrap_workflow_with_dependencies(
     """
     # Store original invoke methods
     original_ainvoke = compiled_graph.ainvoke
-    original_invoke = compiled_graph.invoke
     
     async def ainvoke_with_deps(state: ReviewState, **kwargs) -> ReviewState:
         """执行工作流（注入依赖到 state）。"""
@@ -221,8 +339,9 @@ def _wrap_workflow_with_dependencies(
         state["metadata"]["config"] = config
         state["metadata"]["langchain_tools"] = langchain_tools
         
-        # Call original invoke
-        return original_invoke(state, **kwargs)
+        # Nodes are async-only: run the async graph on the cached background loop
+        future = asyncio.run_coroutine_threadsafe(original_ainvoke(state, **kwargs), _get_sync_loop())
+        return future.result()
     
     # Replace methods
     compiled_graph.ainvoke = ainvoke_with_deps
@@ -336,12 +455,8 @@ async def run_multi_agent_workflow(
     except Exception as e:
         logger.error(f"Workflow execution error: {e}", exc_info=True)
         # Error handling: return error state
-        return {
-            **initial_state,
-            "confirmed_issues": [],
-            "final_report": f"Workflow execution error: {str(e)}",
-            "metadata": {
-                **initial_state.get("metadata", {}),
-                "workflow_error": str(e)
-            }
-        }
+        error_state: ReviewState = dict(initial_state)
+        error_state["confirmed_issues"] = []
+        error_state["final_report"] = f"Workflow execution error: {str(e)}"
+        error_state["metadata"] = merge_metadata(initial_state.get("metadata"), {"workflow_error": str(e)})
+        return error_state
@@ -6,11 +6,29 @@
 构建器现在使用 DAO 层进行持久化，使其幂等并为未来的数据库后端做准备。
 """
 
+import asyncio
+import fnmatch
+import hashlib
+import operator
 import os
+import re
+import shutil
+import sys
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional, Tuple
 from assets.base import BaseAssetBuilder
-from dao.factory import get_storage
+from dao.factory import get_storage_async
+
+# (is_file, entry, relative_path, tree_prefix, depth)
+_TreeItem = Tuple[bool, os.DirEntry, str, str, int]
+
+_entry_name = operator.attrgetter("name")
+
+# Tree indentation segments (interned once; prefixes are built once per directory, not per entry)
+_INDENT_ASCII = sys.intern("  ")
+_INDENT_LAST = sys.intern("    ")
+_INDENT_PIPE = sys.intern("│   ")
 
 
 class RepoMapBuilder(BaseAssetBuilder):
@@ -28,13 +46,211 @@ class RepoMapBuilder(BaseAssetBuilder):
             self.supported_extensions = [".py", ".js", ".ts", ".go", ".java", ".cpp", ".c", ".h"]
         else:
             self.supported_extensions = supported_extensions
+        self._extension_set = frozenset(self.supported_extensions)
+        self._extension_tuple = tuple(self._extension_set)
     
     async def build(self, source_path: Path, **kwargs: Any) -> Dict[str, Any]:
         """从源目录构建仓库地图并保存到 DAO。
         
         此方法遍历目录结构并生成文件树表示。
         结果自动保存到 DAO 层。此方法是幂等的——多次调用将覆盖先前的数据。
+        
+        文件树会作为上下文交给 LLM，因此默认使用纯 ASCII 缩进（`ascii_only=True`），
+        并在超过 `max_lines`（默认 5000）行后截断；`files` 列表不受截断影响。
+        
+        目录遍历是阻塞 IO，在工作线程中执行（不占用事件循环）；各层目录的列举由线程池
+        （`max_workers`，默认见 `_default_max_workers`）并发执行（父目录列出后立即提交子目录），
+        再按排序顺序组装文件树。
+        
+        若 DAO 中已有相同指纹（见 `_fingerprint`）的数据则直接返回，跳过整个遍历；
+        传入 `force=True` 可强制重建，重建结果与已存数据完全相同（指纹与 `_content_hash` 均一致）
+        时跳过写入。`background_save=True` 时保存在后台进行
+        （见 `BaseStorageBackend.save_in_background`），调用方可立即使用返回的数据。
+        
+        `use_ripgrep=True`（或环境变量 `REPO_MAP_USE_RG=1`）时改用 `rg --files` 列出文件，
+        再由排序后的文件列表重建文件树（不含没有匹配文件的目录）；`rg` 不在 PATH 中或执行
+        失败时回退到 `os.scandir` 遍历。
+        """
+        # Get asset key from kwargs, default to "repo_map" for backward compatibility
+        asset_key = kwargs.get("asset_key", "repo_map")
+        
+        storage = await get_storage_async()
+        
+        fingerprint = await asyncio.to_thread(self._fingerprint, source_path, **kwargs)
+        cached = None
+        if fingerprint:
+            try:
+                cached = await storage.load("assets", asset_key)
+            except Exception:
+                cached = None
+            if not isinstance(cached, dict):
+                cached = None
+            elif cached.get("_fingerprint") == fingerprint and not kwargs.get("force", False):
+                return cached
+        
+        rg_files = await self._list_files_ripgrep(source_path, **kwargs) if self._use_ripgrep(**kwargs) else None
+        if rg_files is not None:
+            asset_data = await asyncio.to_thread(self._build_tree_from_files, source_path, rg_files, **kwargs)
+        else:
+            asset_data = await asyncio.to_thread(self._build_tree_sync, source_path, **kwargs)
+        if fingerprint:
+            asset_data["_fingerprint"] = fingerprint
+        
+        # A forced rebuild that produced exactly the stored asset needs no rewrite
+        if (
+            cached is not None
+            and cached.get("_fingerprint") == fingerprint
+            and cached.get("_content_hash") == asset_data["_content_hash"]
+        ):
+            return asset_data
+        
+        # Save to DAO (idempotent - will overwrite if exists). With background_save=True the
+        # write overlaps the caller's next steps; reads of the same key wait for it.
+        if kwargs.get("background_save", False):
+            storage.save_in_background("assets", asset_key, asset_data)
+        else:
+            await storage.save("assets", asset_key, asset_data)
+        
+        return asset_data
+    
+    def _fingerprint(self, source_path: Path, **kwargs: Any) -> Optional[str]:
+        """廉价的变更指纹：根目录与各顶层条目的 mtime_ns + 构建参数。
+        
+        新增/删除/重命名条目会更新其父目录的 mtime，因此根目录与顶层子目录内的变化都能感知；
+        更深层目录中的新增文件不会被感知，此时可用 `force=True` 重建。
+        """
+        try:
+            root = Path(source_path).resolve()
+            parts = [
+                str(root),
+                str(root.stat().st_mtime_ns),
+                repr(sorted(self._extension_set)),
+                repr([kwargs.get(k) for k in ("max_depth", "max_lines", "ascii_only", "exclude_patterns")]),
+                repr(self._use_ripgrep(**kwargs)),
+            ]
+            with os.scandir(root) as it:
+                for entry in sorted(it, key=lambda e: e.name):
+                    parts.append(f"{entry.name}:{entry.stat(follow_symlinks=False).st_mtime_ns}")
+        except OSError:
+            return None
+        return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+    
+    @staticmethod
+    def _use_ripgrep(**kwargs: Any) -> bool:
+        use_rg = kwargs.get("use_ripgrep")
+        if use_rg is None:
+            use_rg = (os.getenv("REPO_MAP_USE_RG") or "0").strip().lower() in ("1", "true", "yes", "on")
+        return bool(use_rg)
+    
+    async def _list_files_ripgrep(self, source_path: Path, **kwargs: Any) -> Optional[List[str]]:
+        """用 `rg --files` 列出匹配扩展名的文件（相对路径）；不可用或失败时返回 None。
+        
+        `--no-ignore` 保持与 scandir 遍历相同的可见范围（不读取 .gitignore），
+        排除规则转换为 `--glob !pattern`，含 "/" 的路径片段在 Python 中按子串过滤。
+        """
+        rg = shutil.which("rg")
+        max_depth = kwargs.get("max_depth", 10)
+        root = Path(source_path).resolve()
+        if rg is None or max_depth < 1 or not root.is_dir():
+            return None
+        
+        exclude_patterns = kwargs.get("exclude_patterns", [".git", "__pycache__", "node_modules", ".venv"])
+        path_patterns = [p for p in exclude_patterns if "/" in p and not any(c in p for c in "*?[")]
+        args = ["--files", "--hidden", "--no-ignore", "--no-messages", "--max-depth", str(max_depth)]
+        for ext in self.supported_extensions:
+            args += ["--glob", f"*{ext}"]
+        for pattern in exclude_patterns:
+            if pattern not in path_patterns:
+                args += ["--glob", f"!{pattern}"]
+        
+        try:
+            proc = await asyncio.create_subprocess_exec(
+                rg, *args,
+                cwd=str(root),
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.DEVNULL,
+            )
+            stdout, _ = await proc.communicate()
+        except OSError:
+            return None
+        # rg exits 1 when nothing matched; 2 means an error (possibly with partial output)
+        if proc.returncode not in (0, 1) and not stdout:
+            return None
+        
+        files = []
+        for line in stdout.decode("utf-8", errors="surrogateescape").splitlines():
+            relative_path = line[2:] if line.startswith("./") else line
+            if os.sep != "/":
+                relative_path = relative_path.replace(os.sep, "/")
+            if relative_path and not any(pattern in relative_path for pattern in path_patterns):
+                files.append(relative_path)
+        return files
+    
+    def _build_tree_from_files(self, source_path: Path, files: List[str], **kwargs: Any) -> Dict[str, Any]:
+        """由文件列表重建文件树（目录在前、文件在后，各自按名称排序，与遍历结果一致）。"""
+        source_path = Path(source_path).resolve()
+        max_lines = max(1, int(kwargs.get("max_lines", 5000)))
+        ascii_only = bool(kwargs.get("ascii_only", True))
+        file_marker, dir_marker = ("- ", "") if ascii_only else ("📄 ", "📁 ")
+        
+        # Nested dicts: directory name -> subtree; files are collected under the None key
+        root: Dict[Any, Any] = {}
+        for relative_path in files:
+            *dirs, name = relative_path.split("/")
+            node = root
+            for d in dirs:
+                node = node.setdefault(d, {})
+            node.setdefault(None, []).append(name)
+        
+        def list_children(node: Dict[Any, Any], rel_dir: str, prefix: str, depth: int) -> List[Tuple[bool, str, Any, str, str, int]]:
+            """(is_file, name, subtree, relative_path, tree_prefix, depth) for one directory node."""
+            child_depth = depth + 1
+            entries = [(False, d) for d in sorted(k for k in node if k is not None)]
+            entries += [(True, name) for name in sorted(node.get(None, []))]
+            if ascii_only:
+                mid_prefix = last_prefix = _INDENT_ASCII * child_depth
+            else:
+                mid_prefix, last_prefix = prefix + _INDENT_PIPE, prefix + _INDENT_LAST
+            last_index = len(entries) - 1
+            children = []
+            for i, (is_file, name) in enumerate(entries):
+                new_prefix = last_prefix if i == last_index else mid_prefix
+                children.append((is_file, name, None if is_file else node[name], f"{rel_dir}{name}", new_prefix, child_depth))
+            return children
+        
+        lines: List[str] = [f"{dir_marker}{source_path.name}/"]
+        ordered_files: List[str] = []
+        omitted = 0
+        stack = list(reversed(list_children(root, "", "", 0)))
+        while stack:
+            is_file, name, subtree, relative_path, prefix, depth = stack.pop()
+            if is_file:
+                ordered_files.append(relative_path)
+                line = f"{prefix}{file_marker}{name}"
+            else:
+                line = f"{prefix}{dir_marker}{name}/"
+                stack.extend(reversed(list_children(subtree, f"{relative_path}/", prefix, depth)))
+            if len(lines) < max_lines:
+                lines.append(line)
+            else:
+                omitted += 1
+        
+        return self._asset_data(source_path, lines, ordered_files, omitted)
+    
+    @staticmethod
+    def _default_max_workers() -> int:
+        """目录列举线程数：`REPO_MAP_MAX_WORKERS`，默认 min(8, CPU 数)。
+        
+        本地磁盘上列举受 GIL 限制，多线程收益有限；网络挂载（NFS/SMB/sshfs）上 readdir
+        以往返延迟为主，可调大到 CPU 数的数倍。
         """
+        try:
+            return int(os.getenv("REPO_MAP_MAX_WORKERS", ""))
+        except ValueError:
+            return min(8, os.cpu_count() or 1)
+    
+    def _build_tree_sync(self, source_path: Path, **kwargs: Any) -> Dict[str, Any]:
+        """同步遍历目录并生成仓库地图数据（由 `build` 放到工作线程中执行）。"""
         source_path = Path(source_path).resolve()
         if not source_path.exists():
             raise ValueError(f"Source path does not exist: {source_path}")
@@ -43,66 +259,188 @@ class RepoMapBuilder(BaseAssetBuilder):
             raise ValueError(f"Source path must be a directory: {source_path}")
         
         max_depth = kwargs.get("max_depth", 10)
+        max_lines = max(1, int(kwargs.get("max_lines", 5000)))
+        ascii_only = bool(kwargs.get("ascii_only", True))
+        max_workers = max(1, int(kwargs.get("max_workers") or self._default_max_workers()))
         exclude_patterns = kwargs.get("exclude_patterns", [".git", "__pycache__", "node_modules", ".venv"])
         
-        file_tree_lines: List[str] = []
-        files: List[str] = []
+        # Plain names (".git", "node_modules", ...) match an entry's basename via one hashed lookup;
+        # glob patterns and path fragments containing "/" are each unioned into one precompiled
+        # regex (fnmatch-equivalent globs against name or relative path; fragments as substrings).
+        exclude_names = frozenset(
+            p for p in exclude_patterns if "/" not in p and not any(c in p for c in "*?[")
+        )
+        glob_patterns = [p for p in exclude_patterns if any(c in p for c in "*?[")]
+        path_patterns = [p for p in exclude_patterns if "/" in p and p not in glob_patterns]
+        glob_re = (
+            re.compile("|".join(fnmatch.translate(os.path.normcase(p)) for p in glob_patterns))
+            if glob_patterns else None
+        )
+        path_re = re.compile("|".join(re.escape(p) for p in path_patterns)) if path_patterns else None
         
-        def should_exclude(path: Path) -> bool:
+        def should_exclude(name: str, relative_path: str) -> bool:
             """Check if a path should be excluded."""
-            path_str = str(path)
-            return any(pattern in path_str for pattern in exclude_patterns)
+            if name in exclude_names:
+                return True
+            if path_re is not None and path_re.search(relative_path):
+                return True
+            if glob_re is not None:
+                return bool(
+                    glob_re.match(os.path.normcase(name)) or glob_re.match(os.path.normcase(relative_path))
+                )
+            return False
+        
+        root_str = str(source_path)
+        # Relative paths are sliced off the known root prefix instead of Path.relative_to().
+        root_prefix_len = len(root_str) if root_str.endswith(os.sep) else len(root_str) + 1
+        extension_set = self._extension_set
+        extension_tuple = self._extension_tuple
+        
+        def file_suffix(name: str) -> str:
+            """Same result as Path(name).suffix, without building a Path."""
+            i = name.rfind(".")
+            return name[i:] if 0 < i < len(name) - 1 else ""
         
-        def build_tree(current_path: Path, prefix: str = "", depth: int = 0) -> None:
-            """Recursively build the file tree representation."""
-            if depth > max_depth:
-                return
+        # ASCII markers are 2 bytes instead of 4-byte emoji + 12-byte box-drawing prefixes per level
+        file_marker, dir_marker = ("- ", "") if ascii_only else ("📄 ", "📁 ")
+        
+        def list_children(dir_path: str, prefix: str, depth: int) -> List[_TreeItem]:
+            """Sorted, non-excluded children of a directory (directories first, then files, by name)."""
+            child_depth = depth + 1
+            if child_depth > max_depth:
+                return []
+            # Partition once (DirEntry caches the dirent type, so is_file needs no extra stat), then
+            # sort each side on the plain name string: directories first, then files.
+            subdirs: List[os.DirEntry] = []
+            files: List[os.DirEntry] = []
+            try:
+                with os.scandir(dir_path) as it:
+                    for entry in it:
+                        (files if entry.is_file(follow_symlinks=False) else subdirs).append(entry)
+            except PermissionError:
+                return []
+            subdirs.sort(key=_entry_name)
+            files.sort(key=_entry_name)
+            entries = [(False, entry) for entry in subdirs] + [(True, entry) for entry in files]
             
-            if should_exclude(current_path):
-                return
+            # Only two distinct child prefixes exist per directory: the last entry's and the rest
+            if ascii_only:
+                mid_prefix = last_prefix = _INDENT_ASCII * child_depth
+            else:
+                mid_prefix, last_prefix = prefix + _INDENT_PIPE, prefix + _INDENT_LAST
+            last_index = len(entries) - 1
+            children = []
+            for i, (is_file, entry) in enumerate(entries):
+                relative_path = entry.path[root_prefix_len:]
+                if should_exclude(entry.name, relative_path):
+                    continue
+                new_prefix = last_prefix if i == last_index else mid_prefix
+                children.append((is_file, entry, relative_path, new_prefix, child_depth))
+            return children
+        
+        def scan_all(top_items: List[_TreeItem]) -> Dict[str, List[_TreeItem]]:
+            """List every directory below the root concurrently (directory path -> children).
             
-            if current_path.is_file():
-                if any(current_path.suffix == ext for ext in self.supported_extensions):
-                    relative_path = current_path.relative_to(source_path)
-                    file_tree_lines.append(f"{prefix}📄 {current_path.name}")
-                    files.append(str(relative_path))
-            elif current_path.is_dir():
-                relative_path = current_path.relative_to(source_path)
-                if relative_path != Path("."):
-                    file_tree_lines.append(f"{prefix}📁 {current_path.name}/")
+            Each listing is submitted as soon as its parent has been listed, so readdir round-trips
+            overlap at every depth (not just across top-level subtrees) - the win on network mounts.
+            """
+            listings: Dict[str, List[_TreeItem]] = {}
+            with ThreadPoolExecutor(max_workers=max_workers) as pool:
+                pending: Dict[Future, str] = {}
+                
+                def submit_subdirs(items: List[_TreeItem]) -> None:
+                    for is_file, entry, _, prefix, depth in items:
+                        if not is_file and depth < max_depth and entry.is_dir(follow_symlinks=False):
+                            pending[pool.submit(list_children, entry.path, prefix, depth)] = entry.path
                 
-                try:
-                    entries = sorted(current_path.iterdir(), key=lambda p: (p.is_file(), p.name))
-                    for i, entry in enumerate(entries):
-                        is_last = i == len(entries) - 1
-                        new_prefix = prefix + ("    " if is_last else "│   ")
-                        build_tree(entry, new_prefix, depth + 1)
-                except PermissionError:
-                    pass
-        
-        # Start building from the root
-        file_tree_lines.append(f"📁 {source_path.name}/")
-        build_tree(source_path, "", 0)
+                submit_subdirs(top_items)
+                while pending:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        children = future.result()
+                        listings[pending.pop(future)] = children
+                        submit_subdirs(children)
+            return listings
+        
+        def walk(items: List[_TreeItem], children_of: Callable[[_TreeItem], List[_TreeItem]]) -> Tuple[List[str], List[str], int]:
+            """Iterative pre-order DFS over `items` and their subtrees.
+            
+            Returns (tree lines capped at max_lines, every matching file, omitted line count).
+            Items are pushed in reverse so they pop in sorted order, matching a recursive walk
+            without its frame overhead or recursion limit.
+            """
+            lines: List[str] = []
+            files: List[str] = []
+            omitted = 0
+            stack = list(reversed(items))
+            while stack:
+                item = stack.pop()
+                is_file, entry, relative_path, prefix, depth = item
+                if is_file:
+                    # One C-level endswith() rejects most files; matches are confirmed with the
+                    # Path.suffix rule (a file named exactly ".py" is still skipped)
+                    name = entry.name
+                    if name.endswith(extension_tuple) and file_suffix(name) in extension_set:
+                        files.append(relative_path)
+                        if len(lines) < max_lines:
+                            lines.append(f"{prefix}{file_marker}{name}")
+                        else:
+                            omitted += 1
+                elif entry.is_dir(follow_symlinks=False):
+                    if len(lines) < max_lines:
+                        lines.append(f"{prefix}{dir_marker}{entry.name}/")
+                    else:
+                        omitted += 1
+                    stack.extend(reversed(children_of(item)))
+            return lines, files, omitted
+        
+        # With workers, all directories are listed concurrently first, then the tree is assembled
+        # by a serial walk over the listings - the output is the same as a single serial walk.
+        top_items = list_children(root_str, "", 0) if max_depth >= 0 else []
+        if max_workers > 1 and any(not item[0] for item in top_items):
+            listings = scan_all(top_items)
+            file_tree_lines, files, omitted_lines = walk(top_items, lambda item: listings.get(item[1].path, []))
+        else:
+            file_tree_lines, files, omitted_lines = walk(
+                top_items, lambda item: list_children(item[1].path, item[3], item[4])
+            )
+        
+        # Root line first; the walk's own lines were capped at max_lines, so trim to make room
+        file_tree_lines.insert(0, f"{dir_marker}{source_path.name}/")
+        if len(file_tree_lines) > max_lines:
+            omitted_lines += len(file_tree_lines) - max_lines
+            del file_tree_lines[max_lines:]
+        return self._asset_data(source_path, file_tree_lines, files, omitted_lines)
+    
+    @staticmethod
+    def _asset_data(
+        source_path: Path, file_tree_lines: List[str], files: List[str], omitted_lines: int
+    ) -> Dict[str, Any]:
+        """组装资产数据（含截断标记与查询索引）。"""
+        if omitted_lines:
+            file_tree_lines.append(f"... ({omitted_lines} more entries truncated)")
+        
+        # Query indexes, built once here instead of lowercasing every path on every query
+        by_suffix: Dict[str, List[str]] = {}
+        for f in files:
+            by_suffix.setdefault(os.path.splitext(f)[1].lower(), []).append(f)
         
         file_tree = "\n".join(file_tree_lines)
+        content_hash = hashlib.blake2b(digest_size=16)
+        content_hash.update(file_tree.encode("utf-8", errors="surrogateescape"))
+        for f in files:
+            content_hash.update(b"\0" + f.encode("utf-8", errors="surrogateescape"))
         
-        # Build the asset data
-        asset_data = {
+        return {
             "file_tree": file_tree,
+            "file_tree_truncated": omitted_lines > 0,
             "file_count": len(files),
             "files": files,
-            "source_path": str(source_path)
+            "source_path": str(source_path),
+            "_lower_files": [f.lower() for f in files],
+            "_by_suffix": by_suffix,
+            "_content_hash": content_hash.hexdigest(),
         }
-        
-        # Get asset key from kwargs, default to "repo_map" for backward compatibility
-        asset_key = kwargs.get("asset_key", "repo_map")
-        
-        # Save to DAO (idempotent - will overwrite if exists)
-        storage = get_storage()
-        await storage.connect()
-        await storage.save("assets", asset_key, asset_data)
-        
-        return asset_data
     
     async def query(self, query: str, **kwargs: Any) -> Dict[str, Any]:
         """Query the repository map.
@@ -123,10 +461,15 @@ class RepoMapBuilder(BaseAssetBuilder):
         files = asset_data.get("files", [])
         
         query_lower = query.lower()
-        matching_files = [
-            f for f in files
-            if query_lower in f.lower() or query_lower in Path(f).suffix.lower()
-        ]
+        by_suffix = asset_data.get("_by_suffix")
+        # Extension-like queries (".py") are a dict lookup on the suffix index
+        if by_suffix is not None and query_lower.startswith(".") and "." not in query_lower[1:] and "/" not in query_lower:
+            matching_files = list(by_suffix.get(query_lower, []))
+        else:
+            lower_files = asset_data.get("_lower_files")
+            if lower_files is None or len(lower_files) != len(files):
+                lower_files = [f.lower() for f in files]
+            matching_files = [files[i] for i, lf in enumerate(lower_files) if query_lower in lf]
         
         return {
             "query": query,
@@ -144,8 +487,7 @@ class RepoMapBuilder(BaseAssetBuilder):
             output_path: Ignored (kept for interface compatibility).
             asset_data: The asset data dictionary to save.
         """
-        storage = get_storage()
-        await storage.connect()
+        storage = await get_storage_async()
         await storage.save("assets", "repo_map", asset_data)
     
     async def load(self, input_path: Path) -> Optional[Dict[str, Any]]:
@@ -160,7 +502,6 @@ class RepoMapBuilder(BaseAssetBuilder):
         Returns:
             A dictionary containing the loaded asset data, or None if not found.
         """
-        storage = get_storage()
-        await storage.connect()
+        storage = await get_storage_async()
         return await storage.load("assets", "repo_map")
 
@@ -104,6 +104,11 @@ class SystemConfig(BaseModel):
         le=1.0,
         description="Clamp expert confidence to this value when tool budget stop is triggered",
     )
+    expert_output_format: str = Field(
+        default="json",
+        pattern="^(json|yaml)$",
+        description="Structured output format requested from experts: json or yaml (yaml uses fewer completion tokens)",
+    )
 
 
 class Config(BaseModel):
@@ -259,6 +264,10 @@ class Config(BaseModel):
                 )
             except ValueError:
                 pass
+        if os.getenv("EXPERT_OUTPUT_FORMAT"):
+            output_format = os.getenv("EXPERT_OUTPUT_FORMAT", "").strip().lower()
+            if output_format in ("json", "yaml"):
+                system_config.expert_output_format = output_format
         
         return cls(llm=llm_config, system=system_config)
     
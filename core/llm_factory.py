@@ -3,15 +3,27 @@
 根据配置创建 LangChain 标准 ChatModel。
 """
 
-from typing import Optional
+from typing import Dict, Optional, Tuple
 from langchain_openai import ChatOpenAI
 from langchain_core.language_models import BaseChatModel
 from langchain_community.chat_models import ChatZhipuAI
 from core.config import LLMConfig
 
+# 相同配置复用同一个 ChatModel（及其 HTTP 连接池），避免每个专家组重新建立连接
+_chat_model_cache: Dict[Tuple, BaseChatModel] = {}
+
+# OpenAI 兼容的 provider -> (默认 base_url, 默认模型名)
+_OPENAI_COMPATIBLE_DEFAULTS: Dict[str, Tuple[Optional[str], Optional[str]]] = {
+    "openai": (None, None),
+    "deepseek": ("https://api.deepseek.com", "deepseek-chat"),
+}
+
 
 def create_chat_model(config: LLMConfig) -> BaseChatModel:
-    """根据配置创建 LangChain 标准 ChatModel。
+    """根据配置创建（或复用已创建的）LangChain 标准 ChatModel。
+    
+    ChatModel 无状态、可在并发调用间共享；按配置缓存实例，使同一次运行中的工作流与
+    各专家组共用一个 HTTP 客户端，省去重复的连接与 TLS 握手。
     
     Args:
         config: LLM 配置对象。
@@ -22,19 +34,21 @@ def create_chat_model(config: LLMConfig) -> BaseChatModel:
     Raises:
         ValueError: 不支持的 provider。
     """
-    if config.provider == "openai":
-        return ChatOpenAI(
-            model=config.model,
-            api_key=config.api_key,
-            base_url=config.base_url,
-            temperature=config.temperature
-        )
-    elif config.provider == "deepseek":
-        # DeepSeek 使用 OpenAI 兼容 API
+    cache_key = (config.provider, config.model, config.api_key, config.base_url, config.temperature)
+    llm = _chat_model_cache.get(cache_key)
+    if llm is None:
+        llm = _chat_model_cache[cache_key] = _build_chat_model(config)
+    return llm
+
+
+def _build_chat_model(config: LLMConfig) -> BaseChatModel:
+    if config.provider in _OPENAI_COMPATIBLE_DEFAULTS:
+        # DeepSeek 等使用 OpenAI 兼容 API，仅默认 base_url / 模型名不同
+        default_base_url, default_model = _OPENAI_COMPATIBLE_DEFAULTS[config.provider]
         return ChatOpenAI(
-            model=config.model or "deepseek-chat",
+            model=config.model or default_model,
             api_key=config.api_key,
-            base_url=config.base_url or "https://api.deepseek.com",
+            base_url=config.base_url or default_base_url,
             temperature=config.temperature
         )
     elif config.provider == "zhipuai":
@@ -81,6 +81,17 @@ class WorkListResponse(BaseModel):
     work_list: List[RiskItem] = Field(..., description="List of risk items for expert review")
 
 
+def merge_metadata(
+    left: Optional[Dict[str, Any]], right: Optional[Dict[str, Any]]
+) -> Optional[Dict[str, Any]]:
+    """metadata 通道的归并函数：节点只需返回变更的键，由 LangGraph 合并到现有 metadata。"""
+    if not left:
+        return right
+    if not right:
+        return left
+    return {**left, **right}
+
+
 class ReviewState(TypedDict, total=False):
     """LangGraph 工作流状态对象。
     
@@ -97,6 +108,7 @@ class ReviewState(TypedDict, total=False):
     
     # Intermediate States
     file_analyses: List[Dict[str, Any]]  # Map-Reduce result for intent analysis (FileAnalysis as dict)
+    file_contents: Dict[str, str]  # Changed-file contents prefetched alongside intent analysis (path -> text)
     work_list: List[Dict[str, Any]]  # Manager's output, tasks for experts (RiskItem as dict)
     
     # Dynamic State for Parallel Execution of Experts
@@ -110,7 +122,7 @@ class ReviewState(TypedDict, total=False):
     # Legacy/Additional fields
     repo_map_summary: str
     lint_errors: List[Dict[str, Any]]
-    metadata: Optional[Dict[str, Any]]
+    metadata: Annotated[Optional[Dict[str, Any]], merge_metadata]  # Nodes return only changed keys
 
 
 class ExpertState(TypedDict):
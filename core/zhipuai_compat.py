@@ -8,14 +8,20 @@ so round-2+ requests can fail with:
   {"error":{"code":"1214","message":"messages 参数非法。请检查文档。"}}
 
 This wrapper preserves tool_calls (from AIMessage.additional_kwargs["tool_calls"])
-and ensures tool message content is stringified.
+and ensures tool message content is stringified. It also reuses one pooled
+httpx.AsyncClient per event loop instead of opening (and TLS-handshaking) a new
+client for every non-streaming request.
 """
 
 from __future__ import annotations
 
+import asyncio
 import json
+import weakref
 from typing import Any, Dict, List, Optional, Tuple
 
+import httpx
+
 from langchain_core.messages import (
     AIMessage,
     BaseMessage,
@@ -24,7 +30,13 @@ from langchain_core.messages import (
     SystemMessage,
     ToolMessage,
 )
-from langchain_community.chat_models.zhipuai import ChatZhipuAI
+from langchain_core.callbacks import AsyncCallbackManagerForLLMRun
+from langchain_core.outputs import ChatResult
+from langchain_community.chat_models.zhipuai import ChatZhipuAI, _get_jwt_token, _truncate_params
+
+# Exact-type dispatch for messages that serialize to a bare {"role", "content"} dict;
+# subclasses and the other message types go through the isinstance checks below.
+_PLAIN_ROLES: Dict[type, str] = {SystemMessage: "system", HumanMessage: "user"}
 
 
 def _stringify_tool_content(content: Any) -> str:
@@ -82,9 +94,55 @@ def _normalize_tool_calls(tool_calls: Any) -> Optional[List[Dict[str, Any]]]:
     return normalized or None
 
 
+# httpx async clients are bound to the loop they were first used on; one pooled client per loop.
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _get_async_client() -> httpx.AsyncClient:
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(timeout=60)
+        _async_clients[loop] = client
+    return client
+
+
 class ChatZhipuAICompat(ChatZhipuAI):
     """Patch ChatZhipuAI message serialization for tool-calling loops."""
 
+    async def _agenerate(  # type: ignore[override]
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        stream: Optional[bool] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        # Same request as upstream, but on a shared keep-alive client (the JWT is still per call).
+        should_stream = stream if stream is not None else self.streaming
+        if should_stream:
+            return await super()._agenerate(messages, stop=stop, run_manager=run_manager, stream=stream, **kwargs)
+
+        if self.zhipuai_api_key is None:
+            raise ValueError("Did not find zhipuai_api_key.")
+        message_dicts, params = self._create_message_dicts(messages, stop)
+        payload = {
+            **params,
+            **kwargs,
+            "messages": message_dicts,
+            "stream": False,
+        }
+        _truncate_params(payload)
+        headers = {
+            "Authorization": _get_jwt_token(self.zhipuai_api_key),
+            "Accept": "application/json",
+        }
+        response = await _get_async_client().post(self.zhipuai_api_base, json=payload, headers=headers)  # type: ignore[arg-type]
+        response.raise_for_status()
+        return self._create_chat_result(response.json())
+
     def _create_message_dicts(  # type: ignore[override]
         self, messages: List[BaseMessage], stop: Optional[List[str]]
     ) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
@@ -133,6 +191,10 @@ class ChatZhipuAICompat(ChatZhipuAI):
                     tool_name_by_id[tc_id] = tc_name
 
         for message in messages:
+            role = _PLAIN_ROLES.get(type(message))
+            if role is not None:
+                message_dicts.append({"role": role, "content": message.content})
+                continue
             if isinstance(message, ChatMessage):
                 message_dicts.append({"role": message.role, "content": message.content})
                 continue
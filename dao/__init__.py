@@ -5,6 +5,6 @@ with support for multiple backend implementations (file, SQL, NoSQL, etc.).
 """
 
 from dao.base import BaseStorageBackend
-from dao.factory import get_storage, StorageFactory
+from dao.factory import get_storage, get_storage_async, StorageFactory
 
-__all__ = ["BaseStorageBackend", "get_storage", "StorageFactory"]
+__all__ = ["BaseStorageBackend", "get_storage", "get_storage_async", "StorageFactory"]
@@ -1,5 +1,6 @@
 """Storage backend implementations."""
 
 from dao.backends.local_file import LocalFileBackend
+from dao.backends.packed_sqlite import PackedCollection
 
-__all__ = ["LocalFileBackend"]
+__all__ = ["LocalFileBackend", "PackedCollection"]
@@ -1,64 +1,329 @@
 """基于本地文件的存储后端实现。
 
-实现基于文件的存储后端，将数据保存为 JSON 文件，
+实现基于文件的存储后端，默认将数据保存为 JSON 文件，
 目录结构：.storage/{collection}/{key}.json
+
+可选 msgpack 编码（需要 msgspec）：.storage/{collection}/{key}.msgpack，
+对大型字符串结构（如仓库地图）编码更快、体积更小。
+
+可选 zstd 压缩（需要 zstandard）：序列化结果超过阈值的条目（如 PR diff、仓库地图摘要）
+压缩后写入同名文件，读取时按 zstd 帧头识别，压缩与否对调用方透明。
 """
 
+import asyncio
+import functools
 import json
+import logging
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
 from pathlib import Path
-from typing import Any, Optional
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional, Set, Tuple, Union
 from dao.base import BaseStorageBackend
+from dao.backends.packed_sqlite import PackedCollection
+
+try:
+    import orjson
+except ImportError:  # optional dependency: faster serialization with fewer intermediate buffers
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:  # optional dependency: msgpack codec
+    msgspec = None
+
+try:
+    import zstandard
+except ImportError:  # optional dependency: compression of large entries
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+
+_JSON_ENCODER = json.JSONEncoder(indent=2, ensure_ascii=False)
+
+
+def _dumps(data: Any) -> Union[bytes, Iterator[bytes]]:
+    """序列化为 UTF-8 JSON（缩进 2，非 ASCII 原样输出）。
+
+    orjson 一次性输出 bytes；未安装 orjson 或 orjson 拒绝但标准库可以编码的数据（如超出
+    64 位的整数）改用 `JSONEncoder.iterencode` 逐块输出，写文件时不必先拼出完整字符串。
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+        except orjson.JSONEncodeError:
+            pass
+    return (chunk.encode("utf-8") for chunk in _JSON_ENCODER.iterencode(data))
+
+
+def _loads(raw: bytes) -> Any:
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+def _msgpack_dumps(data: Any) -> bytes:
+    try:
+        return msgspec.msgpack.encode(data)
+    except msgspec.MsgspecError as e:
+        raise ValueError(str(e))
+
+
+def _msgpack_loads(raw: bytes) -> Any:
+    try:
+        return msgspec.msgpack.decode(raw)
+    except msgspec.MsgspecError as e:
+        raise ValueError(str(e))
+
+
+@functools.lru_cache(maxsize=4096)
+def _sanitize(name: str) -> str:
+    """清理集合名/键，避免路径穿越（同一键在一次审查中会被反复读写，结果缓存）。"""
+    return name.replace("/", "_").replace("..", "")
+
+
+# zstd 帧头（JSON 与 msgpack 条目不会以此开头，读取时据此识别压缩条目）
+_ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+# 压缩级别 3：压缩速度远高于磁盘写入速度，文本类条目体积通常缩小 70% 以上
+_ZSTD_LEVEL = 3
+# zstd 压缩/解压对象不能被多个线程同时使用，每个工作线程各持有一份
+_zstd_local = threading.local()
+
+
+def _compress(payload: bytes) -> bytes:
+    cctx = getattr(_zstd_local, "cctx", None)
+    if cctx is None:
+        cctx = _zstd_local.cctx = zstandard.ZstdCompressor(level=_ZSTD_LEVEL)
+    return cctx.compress(payload)
+
+
+def _decompress(raw: bytes) -> bytes:
+    """解压 zstd 条目；未压缩的内容原样返回。"""
+    if not raw.startswith(_ZSTD_MAGIC):
+        return raw
+    if zstandard is None:
+        raise IOError("Entry is zstd-compressed but zstandard is not installed")
+    dctx = getattr(_zstd_local, "dctx", None)
+    if dctx is None:
+        dctx = _zstd_local.dctx = zstandard.ZstdDecompressor()
+    try:
+        return dctx.decompress(raw)
+    except zstandard.ZstdError as e:
+        raise IOError(f"Corrupt zstd entry: {str(e)}")
+
+
+# save_many 同时写入的文件数上限（避免耗尽文件描述符与默认线程池）
+_SAVE_MANY_CONCURRENCY = 32
+
+# codec -> (file suffix, dumps, loads)
+# (dumps returns the whole payload or an iterator of chunks written in order)
+_CODECS: Dict[str, Tuple[str, Callable[[Any], Union[bytes, Iterator[bytes]]], Callable[[bytes], Any]]] = {
+    "json": (".json", _dumps, _loads),
+    "msgpack": (".msgpack", _msgpack_dumps, _msgpack_loads),
+}
+
+
+def resolve_codec(codec: Optional[str]) -> str:
+    """返回可用的编码名；未知编码或缺少 msgspec 时回退到 json。"""
+    codec = (codec or "json").strip().lower()
+    if codec not in _CODECS:
+        logger.warning(f"Unknown storage codec '{codec}', using json")
+        return "json"
+    if codec == "msgpack" and msgspec is None:
+        logger.warning("Storage codec 'msgpack' requires msgspec; using json")
+        return "json"
+    return codec
 
 
 class LocalFileBackend(BaseStorageBackend):
     """使用本地文件系统的基于文件的存储后端。
     
-    数据以 JSON 文件形式存储，结构：.storage/{collection}/{key}.json
+    数据以 JSON 文件形式存储，结构：.storage/{collection}/{key}.json；
+    `codec="msgpack"` 时存储为 {key}.msgpack，读取时若不存在则回退读取已有的 JSON 文件。
+    文件读写均在工作线程（`asyncio.to_thread`）中执行，并发的节点不会因磁盘 IO 阻塞事件循环。
+    最近读取的条目（`read_cache_size`，默认 256）缓存解析结果，文件未变化时跳过读取与解析。
+    安装 zstandard 时，序列化后超过 `compress_threshold` 字节（默认 4096，0 关闭）的条目压缩存储。
+    
+    `packed_collections` 中的集合（条目多而小，如 LLM 响应缓存）改为打包存储：整个集合存入
+    .storage/{collection}.sqlite3（见 `PackedCollection`），省去每键一个文件的打开/关闭开销；
+    打包前已有的文件条目仍可读取。
     
     此后端适用于 MVP 和开发，在生产环境中可以轻松替换为数据库后端。
     """
     
-    def __init__(self, storage_root: Path = None):
+    def __init__(
+        self,
+        storage_root: Path = None,
+        codec: str = "json",
+        read_cache_size: int = 256,
+        packed_collections: Iterable[str] = (),
+        compress_threshold: int = 4096,
+    ):
         """初始化 LocalFileBackend。"""
         if storage_root is None:
             storage_root = Path.cwd() / ".storage"
         self.storage_root = Path(storage_root).resolve()
+        self._root_str = str(self.storage_root)
+        self.codec = resolve_codec(codec)
+        self._suffix, self._dumps, self._loads = _CODECS[self.codec]
         self._connected = False
+        # (collection, key) -> ((path, inode, mtime_ns, size), parsed data); filled from worker threads
+        self._read_cache: "OrderedDict[Tuple[str, str], Tuple[Tuple[str, int, int, int], Any]]" = OrderedDict()
+        self._read_cache_size = max(0, int(read_cache_size))
+        self._read_cache_lock = threading.Lock()
+        # Collection directories already created by this instance (skips a mkdir per save)
+        self._known_dirs: Set[Path] = set()
+        self._packed_names = frozenset(packed_collections)
+        self._packed: Dict[str, PackedCollection] = {}
+        self._packed_lock = threading.Lock()
+        self._compress_threshold = max(0, int(compress_threshold)) if zstandard is not None else 0
     
     async def connect(self) -> None:
-        """初始化存储目录（幂等操作）。"""
-        self.storage_root.mkdir(parents=True, exist_ok=True)
+        """初始化存储目录（幂等操作；已连接时直接返回）。
+        
+        读写操作不依赖此调用：写入时按需创建目录，目录不存在时读取视为键不存在。
+        """
+        if self._connected:
+            return
+        await asyncio.to_thread(self.storage_root.mkdir, parents=True, exist_ok=True)
         self._connected = True
     
-    def _get_file_path(self, collection: str, key: str) -> Path:
+    def _get_file_path(self, collection: str, key: str, suffix: Optional[str] = None) -> Path:
         """获取集合和键的文件路径。"""
-        # Sanitize collection and key to avoid path traversal
-        collection = collection.replace("/", "_").replace("..", "")
-        key = key.replace("/", "_").replace("..", "")
-        
-        collection_dir = self.storage_root / collection
-        return collection_dir / f"{key}.json"
+        # One Path built from a string instead of two intermediate `/` joins
+        return Path(f"{self._root_str}{os.sep}{_sanitize(collection)}{os.sep}{_sanitize(key)}{suffix or self._suffix}")
     
     async def save(self, collection: str, key: str, data: Any) -> None:
-        """将数据保存到 JSON 文件。
+        """将数据保存到文件（按当前编码序列化）。
+        
+        序列化与写文件在工作线程中执行，不阻塞事件循环；`data` 在返回前不应被修改。
+        同一键的并发保存（含后台保存）按调用顺序落盘。
         
         Raises:
             Exception: 保存操作失败（如权限错误、序列化错误）。
         """
-        if not self._connected:
-            await self.connect()
+        await self._chain_save(collection, key, data)
+    
+    async def save_many(self, collection: str, items: Dict[str, Any]) -> None:
+        """批量保存：集合目录只创建一次，各键在工作线程中并发写入（并发数 `_SAVE_MANY_CONCURRENCY`）。
+        
+        Raises:
+            Exception: 任一键保存失败（其余键照常写入）。
+        """
+        if not items:
+            return
+        await asyncio.gather(*(self.wait_pending_saves(collection, key) for key in items))
+        if collection not in self._packed_names:
+            await asyncio.to_thread(self._ensure_dir, self._get_file_path(collection, next(iter(items))).parent)
+        
+        semaphore = asyncio.Semaphore(_SAVE_MANY_CONCURRENCY)
+        
+        async def _save_one(key: str, data: Any) -> None:
+            async with semaphore:
+                await asyncio.to_thread(self._write, collection, key, data)
         
+        await asyncio.gather(*(_save_one(key, data) for key, data in items.items()))
+    
+    async def _save_background(self, collection: str, key: str, data: Any) -> None:
+        """在工作线程中写入（`save` 与后台保存共用；同键的先后顺序由基类 `_chain_save` 保证）。"""
+        await asyncio.to_thread(self._write, collection, key, data)
+    
+    def _ensure_dir(self, directory: Path) -> None:
+        """创建集合目录（已确认存在的目录不再重复 mkdir）。"""
+        if directory not in self._known_dirs:
+            directory.mkdir(parents=True, exist_ok=True)
+            self._known_dirs.add(directory)
+    
+    def _packed_collection(self, collection: str) -> Optional[PackedCollection]:
+        """返回打包集合的存储；普通集合返回 None。"""
+        if collection not in self._packed_names:
+            return None
+        with self._packed_lock:
+            packed = self._packed.get(collection)
+            if packed is None:
+                packed = self._packed[collection] = PackedCollection(
+                    self.storage_root / f"{_sanitize(collection)}.sqlite3"
+                )
+        return packed
+    
+    def _write(self, collection: str, key: str, data: Any) -> None:
+        self._invalidate(collection, key)
+        packed = self._packed_collection(collection)
+        if packed is not None:
+            self._write_packed(packed, key, data)
+            return
         file_path = self._get_file_path(collection, key)
-        file_path.parent.mkdir(parents=True, exist_ok=True)
+        self._ensure_dir(file_path.parent)
         
         try:
-            with open(file_path, "w", encoding="utf-8") as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
+            payload = self._encode(data)
         except (TypeError, ValueError) as e:
-            raise ValueError(f"Data is not JSON-serializable: {str(e)}")
+            raise ValueError(f"Data is not {self.codec}-serializable: {str(e)}")
+        
+        # Write to a temp file in the same directory, then atomically replace: readers never
+        # see a half-written file and a crash mid-write leaves the previous version intact.
+        # The name is unique per process and thread; os.open applies the umask, so the final
+        # file gets the same permissions a plain open("w") would (mkstemp forces 0600).
+        tmp_path = file_path.parent / f".{file_path.name}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            try:
+                fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o666)
+            except FileNotFoundError:
+                # The directory was removed after it was created; recreate it once
+                self._known_dirs.discard(file_path.parent)
+                self._ensure_dir(file_path.parent)
+                fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o666)
+            with os.fdopen(fd, "wb") as f:
+                if isinstance(payload, bytes):
+                    f.write(payload)
+                else:
+                    # Streamed chunks can still fail to encode partway through
+                    f.writelines(payload)
+            os.replace(tmp_path, file_path)
+        except (TypeError, ValueError) as e:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise ValueError(f"Data is not {self.codec}-serializable: {str(e)}")
         except IOError as e:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
             raise IOError(f"Failed to save data to {file_path}: {str(e)}")
     
+    def _encode(self, data: Any) -> Union[bytes, Iterator[bytes]]:
+        """序列化数据；启用压缩时超过阈值的内容压缩为一个 zstd 帧。"""
+        payload = self._dumps(data)
+        if not self._compress_threshold:
+            return payload
+        if not isinstance(payload, bytes):
+            # Streamed chunks must be joined to measure and compress them
+            payload = b"".join(payload)
+        return _compress(payload) if len(payload) > self._compress_threshold else payload
+    
+    def _write_packed(self, packed: PackedCollection, key: str, data: Any) -> None:
+        try:
+            payload = self._encode(data)
+            if not isinstance(payload, bytes):
+                payload = b"".join(payload)
+        except (TypeError, ValueError) as e:
+            raise ValueError(f"Data is not {self.codec}-serializable: {str(e)}")
+        try:
+            packed.put(key, self.codec, payload)
+        except sqlite3.Error as e:
+            raise IOError(f"Failed to save data to {packed.db_path}: {str(e)}")
+    
+    def _read_packed(self, collection: str, key: str) -> Optional[Tuple[str, bytes, Path]]:
+        """打包集合中的 (编码名, 序列化内容, 数据库路径)；非打包集合或键不存在时返回 None。"""
+        packed = self._packed_collection(collection)
+        if packed is None:
+            return None
+        try:
+            entry = packed.get(key)
+        except sqlite3.Error as e:
+            raise IOError(f"Failed to load data from {packed.db_path}: {str(e)}")
+        return (entry[0], entry[1], packed.db_path) if entry is not None else None
+    
     async def load(self, collection: str, key: str) -> Optional[Any]:
         """Load data from a JSON file.
         
@@ -67,26 +332,101 @@ class LocalFileBackend(BaseStorageBackend):
             key: Unique identifier within the collection.
         
         Returns:
-            The loaded data, or None if the file doesn't exist.
+            The loaded data, or None if the file doesn't exist. Repeated loads of an unchanged
+            file return the same cached object, so callers must not modify it in place.
         
         Raises:
             Exception: If the load operation fails (e.g., invalid JSON, permission error).
         """
-        if not self._connected:
-            await self.connect()
-        
+        # Read-your-writes: a background save of this key must land first
+        await self.wait_pending_saves(collection, key)
+        return await asyncio.to_thread(self._read, collection, key)
+    
+    def _locate(self, collection: str, key: str) -> Optional[Tuple[Path, Callable[[bytes], Any]]]:
+        """返回键对应的现有文件及其解码函数；不存在时返回 None。"""
         file_path = self._get_file_path(collection, key)
+        if file_path.exists():
+            return file_path, self._loads
+        # Entries written before switching codecs are still readable
+        if self.codec != "json":
+            file_path = self._get_file_path(collection, key, ".json")
+            if file_path.exists():
+                return file_path, _loads
+        return None
+    
+    def _read(self, collection: str, key: str) -> Optional[Any]:
+        packed_entry = self._read_packed(collection, key)
+        if packed_entry is not None:
+            codec, raw, db_path = packed_entry
+            try:
+                return _CODECS[codec][2](_decompress(raw))
+            except json.JSONDecodeError as e:
+                raise ValueError(f"Invalid JSON in {db_path} ({key}): {str(e)}")
         
-        if not file_path.exists():
+        located = self._locate(collection, key)
+        if located is None:
             return None
+        file_path, loads = located
         
+        cache_key = (collection, key)
         try:
-            with open(file_path, "r", encoding="utf-8") as f:
-                return json.load(f)
+            with open(file_path, "rb") as f:
+                # Saves replace the file (new inode), so an unchanged stamp means unchanged content
+                st = os.fstat(f.fileno())
+                stamp = (str(file_path), st.st_ino, st.st_mtime_ns, st.st_size)
+                with self._read_cache_lock:
+                    cached = self._read_cache.get(cache_key)
+                    if cached is not None and cached[0] == stamp:
+                        self._read_cache.move_to_end(cache_key)
+                        return cached[1]
+                data = loads(_decompress(f.read()))
         except json.JSONDecodeError as e:
             raise ValueError(f"Invalid JSON in {file_path}: {str(e)}")
         except IOError as e:
             raise IOError(f"Failed to load data from {file_path}: {str(e)}")
+        
+        if self._read_cache_size:
+            with self._read_cache_lock:
+                self._read_cache[cache_key] = (stamp, data)
+                self._read_cache.move_to_end(cache_key)
+                while len(self._read_cache) > self._read_cache_size:
+                    self._read_cache.popitem(last=False)
+        return data
+    
+    async def load_raw(self, collection: str, key: str) -> Optional[bytes]:
+        """读取未解析的 UTF-8 JSON 字节（调用方只需转发文本时省去解析与再序列化）。
+        
+        JSON 条目（压缩条目解压后）原样返回；msgpack 编码的条目解码后再编码为 JSON。
+        
+        Returns:
+            JSON 字节，不存在则返回 None。
+        """
+        await self.wait_pending_saves(collection, key)
+        return await asyncio.to_thread(self._read_raw, collection, key)
+    
+    def _read_raw(self, collection: str, key: str) -> Optional[bytes]:
+        packed_entry = self._read_packed(collection, key)
+        if packed_entry is not None:
+            codec, raw, _ = packed_entry
+            loads = _CODECS[codec][2]
+        else:
+            located = self._locate(collection, key)
+            if located is None:
+                return None
+            file_path, loads = located
+            try:
+                raw = file_path.read_bytes()
+            except IOError as e:
+                raise IOError(f"Failed to load data from {file_path}: {str(e)}")
+        raw = _decompress(raw)
+        if loads is _loads:
+            return raw
+        payload = _dumps(loads(raw))
+        return payload if isinstance(payload, bytes) else b"".join(payload)
+    
+    def _invalidate(self, collection: str, key: str) -> None:
+        with self._read_cache_lock:
+            self._read_cache.pop((collection, key), None)
     
     async def exists(self, collection: str, key: str) -> bool:
         """Check if a key exists in a collection.
@@ -98,11 +438,16 @@ class LocalFileBackend(BaseStorageBackend):
         Returns:
             True if the file exists, False otherwise.
         """
-        if not self._connected:
-            await self.connect()
-        
-        file_path = self._get_file_path(collection, key)
-        return file_path.exists()
+        await self.wait_pending_saves(collection, key)
+        return await asyncio.to_thread(self._exists, collection, key)
+    
+    def _exists(self, collection: str, key: str) -> bool:
+        packed = self._packed_collection(collection)
+        if packed is not None and packed.exists(key):
+            return True
+        if self._get_file_path(collection, key).exists():
+            return True
+        return self.codec != "json" and self._get_file_path(collection, key, ".json").exists()
     
     async def delete(self, collection: str, key: str) -> None:
         """Delete a file from storage.
@@ -114,13 +459,24 @@ class LocalFileBackend(BaseStorageBackend):
         Raises:
             Exception: If the delete operation fails (e.g., permission error).
         """
-        if not self._connected:
-            await self.connect()
-        
-        file_path = self._get_file_path(collection, key)
-        
-        if file_path.exists():
+        await self.wait_pending_saves(collection, key)
+        await asyncio.to_thread(self._delete, collection, key)
+    
+    def _delete(self, collection: str, key: str) -> None:
+        self._invalidate(collection, key)
+        packed = self._packed_collection(collection)
+        if packed is not None:
             try:
-                file_path.unlink()
-            except IOError as e:
-                raise IOError(f"Failed to delete {file_path}: {str(e)}")
+                packed.delete(key)
+            except sqlite3.Error as e:
+                raise IOError(f"Failed to delete {key} from {packed.db_path}: {str(e)}")
+        file_paths = [self._get_file_path(collection, key)]
+        if self.codec != "json":
+            file_paths.append(self._get_file_path(collection, key, ".json"))
+        
+        for file_path in file_paths:
+            if file_path.exists():
+                try:
+                    file_path.unlink()
+                except IOError as e:
+                    raise IOError(f"Failed to delete {file_path}: {str(e)}")
@@ -0,0 +1,59 @@
+"""打包集合：同一集合的所有键存入一个 SQLite 文件。
+
+条目多而小、读写频繁的集合（如 LLM 响应缓存）按"每键一个文件"存储时，打开/关闭文件与
+目录项开销占主导；打包集合把整个集合存为 .storage/{collection}.sqlite3 中的一张表
+（WAL 模式，多进程可安全并发读写）。条目内容仍由存储后端按当前编码序列化。
+"""
+
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Optional, Tuple
+
+
+class PackedCollection:
+    """单个集合的 SQLite 存储（同步接口，由后端在工作线程中调用，线程安全）。"""
+
+    def __init__(self, db_path: Path):
+        """初始化打包集合（首次访问时才创建数据库文件）。"""
+        self.db_path = Path(db_path)
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.db_path), timeout=30, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, codec TEXT NOT NULL, value BLOB NOT NULL)"
+            )
+            self._conn = conn
+        return self._conn
+
+    def get(self, key: str) -> Optional[Tuple[str, bytes]]:
+        """返回 (编码名, 序列化内容)，不存在时返回 None。"""
+        with self._lock:
+            row = self._connection().execute("SELECT codec, value FROM entries WHERE key = ?", (key,)).fetchone()
+        return (row[0], bytes(row[1])) if row else None
+
+    def put(self, key: str, codec: str, value: bytes) -> None:
+        with self._lock:
+            self._connection().execute(
+                "INSERT OR REPLACE INTO entries (key, codec, value) VALUES (?, ?, ?)", (key, codec, value)
+            )
+
+    def exists(self, key: str) -> bool:
+        with self._lock:
+            return self._connection().execute("SELECT 1 FROM entries WHERE key = ?", (key,)).fetchone() is not None
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._connection().execute("DELETE FROM entries WHERE key = ?", (key,))
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
@@ -4,8 +4,13 @@
 支持未来迁移到 SQL、NoSQL 或 GraphDB。
 """
 
+import asyncio
+import json
+import logging
 from abc import ABC, abstractmethod
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
 
 
 class BaseStorageBackend(ABC):
@@ -60,3 +65,85 @@ class BaseStorageBackend(ABC):
             Exception: 删除失败。
         """
         pass
+    
+    async def load_raw(self, collection: str, key: str) -> Optional[bytes]:
+        """读取未解析的 UTF-8 JSON 字节（默认由 `load` 的结果重新序列化，后端可覆盖为直接读取）。
+        
+        Returns:
+            JSON 字节，不存在则返回 None。
+        """
+        data = await self.load(collection, key)
+        if data is None:
+            return None
+        return json.dumps(data, ensure_ascii=False).encode("utf-8")
+    
+    async def save_many(self, collection: str, items: Dict[str, Any]) -> None:
+        """批量保存同一集合中的多个键（默认并发调用 `save`，后端可覆盖以合并开销）。
+        
+        Raises:
+            Exception: 任一键保存失败（其余键的写入不回滚）。
+        """
+        if items:
+            await asyncio.gather(*(self.save(collection, key, data) for key, data in items.items()))
+    
+    def save_in_background(self, collection: str, key: str, data: Any) -> "asyncio.Task[None]":
+        """调度后台保存并立即返回（调用方无需等待写入即可继续后续工作）。
+        
+        同一键的多次后台保存按调度顺序执行；`data` 在写入完成前不应再被修改。
+        后台写入失败只记录日志，需要确认落盘时调用 `wait_pending_saves`。
+        
+        Returns:
+            执行保存的 asyncio.Task。
+        """
+        task = self._chain_save(collection, key, data)
+        
+        def _log_failure(t: "asyncio.Task[None]") -> None:
+            if not t.cancelled() and t.exception() is not None:
+                logger.warning(f"Background save failed ({collection}/{key}): {t.exception()}")
+        
+        task.add_done_callback(_log_failure)
+        return task
+    
+    def _chain_save(self, collection: str, key: str, data: Any) -> "asyncio.Task[None]":
+        """调度一次 `_save_background`，排在同一键已调度的保存之后（按调度顺序落盘）。"""
+        pending = self._pending_saves()
+        pending_key = (collection, key)
+        previous = pending.get(pending_key)
+        
+        async def _run() -> None:
+            if previous is not None:
+                await asyncio.gather(previous, return_exceptions=True)
+            await self._save_background(collection, key, data)
+        
+        task = asyncio.create_task(_run())
+        pending[pending_key] = task
+        
+        def _done(t: "asyncio.Task[None]") -> None:
+            if pending.get(pending_key) is t:
+                del pending[pending_key]
+        
+        task.add_done_callback(_done)
+        return task
+    
+    async def wait_pending_saves(self, collection: Optional[str] = None, key: Optional[str] = None) -> None:
+        """等待后台保存完成：指定集合与键时只等待该键，否则等待全部。"""
+        pending = self._pending_saves()
+        if collection is not None and key is not None:
+            tasks = [pending[(collection, key)]] if (collection, key) in pending else []
+        else:
+            tasks = list(pending.values())
+        current = asyncio.current_task()
+        tasks = [t for t in tasks if t is not current]
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+    
+    async def _save_background(self, collection: str, key: str, data: Any) -> None:
+        """后台保存的实际写入；阻塞式后端可覆盖为在工作线程中写入。"""
+        await self.save(collection, key, data)
+    
+    def _pending_saves(self) -> Dict[Tuple[str, str], "asyncio.Task[None]"]:
+        # Created lazily so subclasses need not call a base __init__
+        pending = self.__dict__.get("_pending_save_tasks")
+        if pending is None:
+            pending = self.__dict__["_pending_save_tasks"] = {}
+        return pending
@@ -3,12 +3,50 @@
 提供存储后端的单例工厂模式，确保每种后端类型只创建一个实例并重复使用。
 """
 
-from typing import Optional
+import os
+from typing import Callable, Dict, Optional
 from pathlib import Path
 from dao.base import BaseStorageBackend
 from dao.backends.local_file import LocalFileBackend
 
 
+def _build_local_backend(**kwargs) -> BaseStorageBackend:
+    storage_root = kwargs.get("storage_root")
+    # 编码协商：显式参数优先，其次 STORAGE_CODEC（json | msgpack，msgpack 需要 msgspec）
+    codec = kwargs.get("codec") or os.getenv("STORAGE_CODEC", "json")
+    # 解析结果的读缓存条目数（STORAGE_READ_CACHE_SIZE，0 关闭）
+    read_cache_size = kwargs.get("read_cache_size")
+    if read_cache_size is None:
+        try:
+            read_cache_size = int(os.getenv("STORAGE_READ_CACHE_SIZE", "256"))
+        except ValueError:
+            read_cache_size = 256
+    # 打包存储的集合（STORAGE_PACKED_COLLECTIONS，逗号分隔，如 "llm_response_cache"）
+    packed_collections = kwargs.get("packed_collections")
+    if packed_collections is None:
+        packed_collections = [c.strip() for c in os.getenv("STORAGE_PACKED_COLLECTIONS", "").split(",") if c.strip()]
+    # 超过该字节数的条目以 zstd 压缩存储（STORAGE_COMPRESS_THRESHOLD，0 关闭；需要 zstandard）
+    compress_threshold = kwargs.get("compress_threshold")
+    if compress_threshold is None:
+        try:
+            compress_threshold = int(os.getenv("STORAGE_COMPRESS_THRESHOLD", "4096"))
+        except ValueError:
+            compress_threshold = 4096
+    return LocalFileBackend(
+        storage_root=storage_root,
+        codec=codec,
+        read_cache_size=read_cache_size,
+        packed_collections=packed_collections,
+        compress_threshold=compress_threshold,
+    )
+
+
+# 存储类型 -> 后端构造函数（新增后端时在此注册）
+_BACKEND_BUILDERS: Dict[str, Callable[..., BaseStorageBackend]] = {
+    "local": _build_local_backend,
+}
+
+
 class StorageFactory:
     """创建存储后端实例的工厂类。
     
@@ -31,26 +69,19 @@ class StorageFactory:
         Raises:
             ValueError: 存储类型不支持。
         """
-        # Use default type if not specified
-        if not storage_type:
-            storage_type = cls._default_type
+        storage_type = storage_type or cls._default_type
+        instance = cls._instances.get(storage_type)
+        if instance is not None:
+            return instance
         
-        # Return existing instance if available
-        if storage_type in cls._instances:
-            return cls._instances[storage_type]
-        
-        # Create new instance based on type
-        if storage_type == "local":
-            storage_root = kwargs.get("storage_root")
-            instance = LocalFileBackend(storage_root=storage_root)
-        else:
+        builder = _BACKEND_BUILDERS.get(storage_type)
+        if builder is None:
             raise ValueError(
                 f"Unsupported storage type: {storage_type}. "
                 f"Supported types: local (SQL/NoSQL backends coming soon)"
             )
         
-        # Store and return instance
-        cls._instances[storage_type] = instance
+        instance = cls._instances[storage_type] = builder(**kwargs)
         return instance
     
     @classmethod
@@ -65,5 +96,15 @@ class StorageFactory:
 
 
 def get_storage(storage_type: str = "local", **kwargs) -> BaseStorageBackend:
-    """便捷函数，获取存储后端实例。"""
+    """便捷函数，获取存储后端实例（已创建时只做一次字典查找）。"""
+    instance = StorageFactory._instances.get(storage_type)
+    if instance is not None:
+        return instance
     return StorageFactory.get_storage(storage_type, **kwargs)
+
+
+async def get_storage_async(storage_type: str = "local", **kwargs) -> BaseStorageBackend:
+    """获取已连接的存储后端实例（首次调用时完成连接，之后 `connect()` 直接返回）。"""
+    instance = get_storage(storage_type, **kwargs)
+    await instance.connect()
+    return instance
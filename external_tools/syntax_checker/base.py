@@ -4,25 +4,45 @@
 语法检查器在基于 AI 的代码审查之前提供确定性静态分析。
 """
 
+import asyncio
+import os
+import subprocess
 from abc import ABC, abstractmethod
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, List
+from typing import Any, ClassVar, Dict, FrozenSet, List
 
-from pydantic import BaseModel, Field
 
-
-class LintError(BaseModel):
-    """单个 lint 错误。"""
+@dataclass(frozen=True, slots=True)
+class LintError:
+    """单个 lint 错误。
+    
+    检查器解析输出时每个 PR 可能创建上千个实例，使用不可变的 slots 数据类而非 Pydantic 模型，
+    构造时不做校验；字段类型由各检查器的解析逻辑保证。
     
-    file: str = Field(..., description="File path relative to repository root")
-    line: int = Field(..., description="Line number (1-indexed)")
-    message: str = Field(..., description="Error message")
-    severity: str = Field(default="error", description="Severity: error, warning, or info")
-    code: str = Field(default="", description="Optional error code (e.g., 'E501', 'F401')")
+    Attributes:
+        file: 相对于仓库根目录的文件路径。
+        line: 行号（从 1 开始）。
+        message: 错误信息。
+        severity: 严重程度：error、warning 或 info。
+        code: 可选的错误代码（如 'E501'、'F401'）。
+    """
     
-    class Config:
-        """Pydantic 配置。"""
-        frozen = True
+    file: str
+    line: int
+    message: str
+    severity: str = "error"
+    code: str = ""
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """转换为字典（用于 JSON 序列化与工作流状态）。"""
+        return {
+            "file": self.file,
+            "line": self.line,
+            "message": self.message,
+            "severity": self.severity,
+            "code": self.code,
+        }
 
 
 class BaseSyntaxChecker(ABC):
@@ -31,8 +51,20 @@ class BaseSyntaxChecker(ABC):
     所有语法检查器必须继承此类并实现 `check` 方法。
     检查器负责在文件列表上运行静态分析工具（如 ruff、eslint），
     并返回标准化的错误报告。
+    
+    目录中的文件名列表在所有检查器间共享缓存（同一文件可能被多个检查器检查），
+    每次审查开始时由 `clear_existence_cache` 清空。
     """
     
+    # directory -> names of regular files in it (shared by all checkers within a review run)
+    _existence_cache: ClassVar[Dict[Path, FrozenSet[str]]] = {}
+    
+    @classmethod
+    def clear_existence_cache(cls) -> None:
+        """清空文件存在性缓存（每次审查开始时调用，避免使用过期的目录内容）。"""
+        BaseSyntaxChecker._existence_cache.clear()
+    
+
     @abstractmethod
     async def check(
         self,
@@ -52,6 +84,39 @@ class BaseSyntaxChecker(ABC):
         """
         pass
     
+    async def _run_command(
+        self,
+        cmd: List[str],
+        cwd: Path,
+        text: bool = False
+    ) -> subprocess.CompletedProcess:
+        """异步运行外部检查工具，不阻塞事件循环（多个检查器可并发执行）。
+        
+        Args:
+            cmd: 命令及参数。
+            cwd: 工作目录。
+            text: 为 True 时将 stdout/stderr 按 UTF-8 解码为字符串，否则保留 bytes。
+        
+        Returns:
+            与 `subprocess.run(..., capture_output=True, check=False)` 相同形式的结果。
+        """
+        proc = await asyncio.create_subprocess_exec(
+            *cmd,
+            cwd=cwd,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+        )
+        try:
+            stdout, stderr = await proc.communicate()
+        except asyncio.CancelledError:
+            # Don't leave the tool running when the review is cancelled
+            proc.kill()
+            raise
+        if text:
+            stdout = stdout.decode("utf-8", errors="replace")
+            stderr = stderr.decode("utf-8", errors="replace")
+        return subprocess.CompletedProcess(cmd, proc.returncode, stdout, stderr)
+    
     @abstractmethod
     def get_supported_extensions(self) -> List[str]:
         """获取此检查器支持的文件扩展名列表。"""
@@ -62,10 +127,21 @@ class BaseSyntaxChecker(ABC):
         repo_path: Path,
         files: List[str]
     ) -> List[Path]:
-        """过滤文件列表，仅包含存在的文件。"""
-        existing = []
-        for file_path in files:
-            full_path = repo_path / file_path
-            if full_path.exists() and full_path.is_file():
-                existing.append(full_path)
-        return existing
+        """过滤文件列表，仅包含存在的文件。
+        
+        按父目录分组，每个目录只 `os.scandir` 一次，而不是对每个文件分别 stat；
+        目录内容缓存在 `_existence_cache` 中，其他检查器检查同一目录时不再重复扫描。
+        """
+        full_paths = [repo_path / file_path for file_path in files]
+        cache = BaseSyntaxChecker._existence_cache
+        for directory in {full_path.parent for full_path in full_paths}:
+            if directory in cache:
+                continue
+            try:
+                with os.scandir(directory) as entries:
+                    cache[directory] = frozenset(entry.name for entry in entries if entry.is_file())
+            except OSError:
+                # Missing directory, not a directory, or unreadable: none of its files exist
+                cache[directory] = frozenset()
+        
+        return [full_path for full_path in full_paths if full_path.name in cache[full_path.parent]]
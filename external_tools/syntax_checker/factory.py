@@ -1,9 +1,22 @@
 """基于文件扩展名创建语法检查器的工厂。"""
 
+import asyncio
+import functools
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 
-from external_tools.syntax_checker.base import BaseSyntaxChecker
+from external_tools.syntax_checker.base import BaseSyntaxChecker, LintError
+from external_tools.syntax_checker.config_loader import SyntaxCheckerConfig, create_checker_instance
+
+
+def _file_suffix(file_path: str) -> str:
+    """扩展名（含点，保留大小写），语义同 `Path(file_path).suffix`，但不构造 Path 对象。"""
+    name = file_path[file_path.rfind("/") + 1:]
+    dot = name.rfind(".")
+    # ".bashrc" and "file." have no suffix
+    if dot <= 0 or dot == len(name) - 1:
+        return ""
+    return name[dot:]
 
 
 class CheckerFactory:
@@ -14,7 +27,8 @@ class CheckerFactory:
     """
     
     _checkers: Dict[str, type[BaseSyntaxChecker]] = {}
-    _extension_map: Dict[str, List[type[BaseSyntaxChecker]]] = {}
+    # Lowercase extension -> checker classes (immutable tuples, safe to hand out and cache)
+    _extension_map: Dict[str, Tuple[type[BaseSyntaxChecker], ...]] = {}
     
     @classmethod
     def register(
@@ -29,10 +43,16 @@ class CheckerFactory:
             ext = ext if ext.startswith(".") else f".{ext}"
             ext_lower = ext.lower()
             # Support multiple checkers per extension
-            if ext_lower not in cls._extension_map:
-                cls._extension_map[ext_lower] = []
-            if checker_class not in cls._extension_map[ext_lower]:
-                cls._extension_map[ext_lower].append(checker_class)
+            existing = cls._extension_map.get(ext_lower, ())
+            if checker_class not in existing:
+                cls._extension_map[ext_lower] = existing + (checker_class,)
+        cls._resolve.cache_clear()
+    
+    @staticmethod
+    @functools.lru_cache(maxsize=128)
+    def _resolve(suffix: str) -> Tuple[type[BaseSyntaxChecker], ...]:
+        """扩展名 -> 检查器类元组（按原始扩展名缓存，`register` 时清空）。"""
+        return CheckerFactory._extension_map.get(suffix.lower(), ())
     
     @classmethod
     def get_checkers_for_file(
@@ -44,9 +64,7 @@ class CheckerFactory:
         Returns:
             此文件的检查器类列表。如果未注册检查器，返回空列表。
         """
-        path = Path(file_path)
-        ext = path.suffix.lower()
-        return cls._extension_map.get(ext, [])
+        return list(cls._resolve(_file_suffix(file_path)))
     
     @classmethod
     def get_checker_for_file(
@@ -69,16 +87,57 @@ class CheckerFactory:
             如果为同一扩展名注册了多个检查器，多个检查器可以检查同一文件。
         """
         grouped: Dict[type[BaseSyntaxChecker], List[str]] = {}
+        resolve = cls._resolve
         
         for file_path in files:
-            checker_classes = cls.get_checkers_for_file(file_path)
-            for checker_class in checker_classes:
+            for checker_class in resolve(_file_suffix(file_path)):
                 if checker_class not in grouped:
                     grouped[checker_class] = []
                 grouped[checker_class].append(file_path)
         
         return grouped
     
+    @classmethod
+    async def run_all(
+        cls,
+        repo_path: Path,
+        files: List[str],
+        config: Optional[SyntaxCheckerConfig] = None
+    ) -> List[LintError]:
+        """对文件运行所有适用的检查器（各检查器并发执行）。
+        
+        每个检查器类只创建一个实例（按配置创建），外部工具进程在时间上重叠，
+        总耗时取决于最慢的检查器而非所有检查器之和。单个检查器失败时打印警告并跳过。
+        
+        Returns:
+            按检查器分组顺序合并的 LintError 列表。
+        """
+        grouped = cls.get_checkers_for_files(files)
+        if not grouped:
+            return []
+        
+        async def _run_one(checker_class: type[BaseSyntaxChecker]) -> List[LintError]:
+            # Create checker instance with configuration (if available)
+            checker = create_checker_instance(checker_class, config)
+            return await checker.check(repo_path, grouped[checker_class])
+        
+        checker_classes = list(grouped)
+        results = await asyncio.gather(
+            *(_run_one(checker_class) for checker_class in checker_classes),
+            return_exceptions=True,
+        )
+        
+        all_errors: List[LintError] = []
+        for checker_class, result in zip(checker_classes, results):
+            if isinstance(result, BaseException):
+                if not isinstance(result, Exception):
+                    raise result
+                # Gracefully handle checker failures
+                print(f"  ⚠️  Warning: {checker_class.__name__} failed: {result}")
+                continue
+            all_errors.extend(result)
+        return all_errors
+    
     @classmethod
     def get_all_checkers(cls) -> Dict[str, type[BaseSyntaxChecker]]:
         """获取所有已注册的检查器。"""
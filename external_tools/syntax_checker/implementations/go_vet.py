@@ -4,15 +4,57 @@ This module implements a syntax checker for Go files using go vet,
 the official Go static analysis tool that comes with the Go standard library.
 """
 
-import re
 import shutil
-import subprocess
 from pathlib import Path
-from typing import List
+from typing import List, Optional, Tuple
 
 from external_tools.syntax_checker.base import BaseSyntaxChecker, LintError
 
 
+def _split_vet_line(line: str) -> Optional[Tuple[str, str, str, str]]:
+    """Split a go vet output line into (file, line, column, message).
+    
+    Format: file.go:line:column: message (or file.go:line: message, column "1").
+    The message starts after the first ": ", so colons inside the message and in
+    Windows drive letters ("C:\\...") are kept intact.
+    
+    Returns:
+        The four fields, or None if the line is not a diagnostic (e.g. "# pkg" headers).
+    """
+    location, sep, message = line.partition(": ")
+    message = message.lstrip()
+    if not sep or not message:
+        return None
+    if location == "vet":
+        # Type-check failures may be prefixed with the tool name: "vet: file.go:line:column: message"
+        return _split_vet_line(message)
+    parts = location.rsplit(":", 2)
+    if len(parts) == 3 and parts[0] and parts[1].isdigit() and parts[2].isdigit():
+        return parts[0], parts[1], parts[2], message
+    file_path, _, line_str = location.rpartition(":")
+    if file_path and line_str.isdigit():
+        return file_path, line_str, "1", message
+    return None
+
+
+# (needle, code, match against the lowercased message), checked in order; first hit wins.
+# go vet doesn't provide codes, so they are inferred from the message.
+_GO_VET_CODE_TAGS = (
+    ("Printf", "printf", False),
+    ("unused", "unused", True),
+    ("nil", "nil", True),
+)
+
+
+def _infer_vet_code(message: str) -> str:
+    """Infer an error code from a go vet message ("" if none applies)."""
+    message_lower = message.lower()
+    for needle, code, ignore_case in _GO_VET_CODE_TAGS:
+        if needle in (message_lower if ignore_case else message):
+            return code
+    return ""
+
+
 class GoVetChecker(BaseSyntaxChecker):
     """Syntax checker for Go files using go vet.
     
@@ -102,103 +144,82 @@ class GoVetChecker(BaseSyntaxChecker):
                 packages[package_dir] = []
             packages[package_dir].append(file_path)
         
+        # go vet accepts several packages at once: one invocation pays the toolchain
+        # startup once instead of once per package.
+        package_paths = [
+            "./" + str(package_dir) if package_dir != Path(".") else "./..."
+            for package_dir in packages
+        ]
+        if "./..." in package_paths:
+            # The repository root pattern already covers every other package
+            package_paths = ["./..."]
+        
         all_errors = []
         
         try:
-            for package_dir, package_files in packages.items():
-                # Build go vet command
-                # go vet checks packages, so we pass the package path
-                package_path = "./" + str(package_dir) if package_dir != Path(".") else "./..."
-                
-                cmd = [
-                    "go",
-                    "vet",
-                    package_path
-                ]
-                
-                result = subprocess.run(
-                    cmd,
-                    cwd=repo_path,
-                    capture_output=True,
-                    text=True,
-                    check=False,  # Don't raise on non-zero exit
-                    encoding="utf-8"
-                )
-                
-                # go vet returns non-zero exit code if errors are found
-                # Exit codes: 0 = no errors, non-zero = errors found
-                if result.returncode == 0:
-                    # No errors found
+            cmd = [
+                "go",
+                "vet",
+                *package_paths
+            ]
+            
+            result = await self._run_command(cmd, cwd=repo_path, text=True)
+            
+            # go vet returns non-zero exit code if errors are found
+            # Exit codes: 0 = no errors, non-zero = errors found
+            if result.returncode == 0:
+                # No errors found
+                return []
+            
+            # Parse text output
+            # Format: file.go:line:column: message
+            # Example: pkg/services/authz/rbac.go:10:5: Printf format %d has arg #1 of wrong type
+            # go vet outputs to stderr, not stdout
+            output = result.stderr.strip() or result.stdout.strip()
+            if not output:
+                return []
+            
+            # Parse each line (with several packages, "# pkg" header lines are skipped)
+            for line in output.split("\n"):
+                line = line.strip()
+                if not line:
                     continue
                 
-                # Parse text output
-                # Format: file.go:line:column: message
-                # Example: pkg/services/authz/rbac.go:10:5: Printf format %d has arg #1 of wrong type
-                if not result.stdout.strip() and not result.stderr.strip():
+                fields = _split_vet_line(line)
+                if fields is None:
                     continue
+                file_path_str, line_str, col_str, message = fields
                 
-                # go vet outputs to stderr, not stdout
-                output = result.stderr.strip() or result.stdout.strip()
-                
-                # Parse each line
-                # Pattern: file.go:line:column: message
-                pattern = re.compile(r'^(.+?):(\d+):(\d+):\s+(.+)$')
-                
-                for line in output.split("\n"):
-                    if not line.strip():
-                        continue
-                    
-                    match = pattern.match(line.strip())
-                    if not match:
-                        # Try alternative format without column: file.go:line: message
-                        alt_pattern = re.compile(r'^(.+?):(\d+):\s+(.+)$')
-                        match = alt_pattern.match(line.strip())
-                        if not match:
-                            continue
-                        file_path_str, line_str, message = match.groups()
-                        col_str = "1"
-                    else:
-                        file_path_str, line_str, col_str, message = match.groups()
-                    
-                    # Get relative path from repo_path
-                    # go vet outputs paths relative to the working directory (repo_path)
-                    file_path = Path(file_path_str)
-                    if file_path.is_absolute():
-                        try:
-                            file_path = file_path.relative_to(repo_path)
-                        except ValueError:
-                            # File is outside repo, skip
-                            continue
-                    else:
-                        # Relative path, already relative to repo_path
-                        # Normalize the path (remove ./ prefix if present)
-                        if file_path_str.startswith("./"):
-                            file_path = Path(file_path_str[2:])
-                    
-                    file_path_str_relative = str(file_path)
-                    
-                    # Parse line number
+                # Get relative path from repo_path
+                # go vet outputs paths relative to the working directory (repo_path)
+                file_path = Path(file_path_str)
+                if file_path.is_absolute():
                     try:
-                        line_num = int(line_str)
+                        file_path = file_path.relative_to(repo_path)
                     except ValueError:
-                        line_num = 1
-                    
-                    # Extract error code if present (go vet doesn't provide codes, but we can infer from message)
-                    code = ""
-                    if "Printf" in message:
-                        code = "printf"
-                    elif "unused" in message.lower():
-                        code = "unused"
-                    elif "nil" in message.lower():
-                        code = "nil"
-                    
-                    all_errors.append(LintError(
-                        file=file_path_str_relative,
-                        line=line_num,
-                        message=message,
-                        severity="error",  # go vet only reports errors
-                        code=code
-                    ))
+                        # File is outside repo, skip
+                        continue
+                else:
+                    # Relative path, already relative to repo_path
+                    # Normalize the path (remove ./ prefix if present)
+                    if file_path_str.startswith("./"):
+                        file_path = Path(file_path_str[2:])
+                
+                file_path_str_relative = str(file_path)
+                
+                # Parse line number
+                try:
+                    line_num = int(line_str)
+                except ValueError:
+                    line_num = 1
+                
+                all_errors.append(LintError(
+                    file=file_path_str_relative,
+                    line=line_num,
+                    message=message,
+                    severity="error",  # go vet only reports errors
+                    code=_infer_vet_code(message)
+                ))
             
             return all_errors
         
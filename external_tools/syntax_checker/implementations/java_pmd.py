@@ -4,14 +4,43 @@ This module implements a syntax checker for Java files using PMD (Source Code An
 a static analysis tool that analyzes Java source code for potential bugs and code quality issues.
 """
 
+import io
 import json
+import os
 import shutil
-import subprocess
 from pathlib import Path
-from typing import List
+from typing import Any, Iterator, List
 
 from external_tools.syntax_checker.base import BaseSyntaxChecker, LintError
 
+try:
+    import ijson
+except ImportError:  # optional dependency: streaming parse of large PMD reports
+    ijson = None
+
+# Errors raised while parsing the PMD report (ijson's errors are not ValueErrors)
+_PMD_PARSE_ERRORS = (ValueError, ijson.JSONError) if ijson is not None else (ValueError,)
+
+
+def _iter_pmd_files(stdout: bytes) -> Iterator[Any]:
+    """Yield the entries of the report's top-level "files" array.
+    
+    With ijson installed the report is parsed incrementally, one file entry at a time,
+    instead of materializing the whole document first. Otherwise falls back to json.loads.
+    
+    Raises:
+        ValueError: (or ijson.JSONError) if the output is not valid JSON.
+    """
+    if ijson is not None:
+        yield from ijson.items(io.BytesIO(stdout), "files.item")
+        return
+    data = json.loads(stdout)
+    if not isinstance(data, dict):
+        return
+    files_data = data.get("files", [])
+    if isinstance(files_data, list):
+        yield from files_data
+
 
 class JavaPMDChecker(BaseSyntaxChecker):
     """Syntax checker for Java files using PMD.
@@ -101,7 +130,14 @@ class JavaPMDChecker(BaseSyntaxChecker):
         # -f json: JSON output format
         # -d: Directory or files to analyze
         # Use relative paths from repo_path
-        relative_paths = [str(f.relative_to(repo_path)) for f in existing_files]
+        # Filtered paths are repo_path / file, so stripping the "repo_path/" prefix from the
+        # string gives the relative path without a Path.relative_to() per file
+        # (for repo_path "." the joined paths carry no prefix and are used as-is)
+        repo_prefix = os.path.join(str(repo_path), "")
+        relative_paths = [
+            path_str[len(repo_prefix):] if path_str.startswith(repo_prefix) else path_str
+            for path_str in map(str, existing_files)
+        ]
         
         try:
             # Build PMD command with ADC strategy:
@@ -121,14 +157,8 @@ class JavaPMDChecker(BaseSyntaxChecker):
             for rel_path in relative_paths:
                 cmd.extend(["-d", rel_path])
             
-            result = subprocess.run(
-                cmd,
-                cwd=repo_path,
-                capture_output=True,
-                text=True,
-                check=False,  # Don't raise on non-zero exit
-                encoding="utf-8"
-            )
+            # Raw bytes: the JSON report is parsed (or streamed) without decoding it first
+            result = await self._run_command(cmd, cwd=repo_path)
             
             # PMD returns non-zero exit code if errors are found
             # Exit codes: 0 = no errors, 4 = violations found (both are valid)
@@ -137,7 +167,8 @@ class JavaPMDChecker(BaseSyntaxChecker):
                 # Other codes indicate actual failures
                 # Check stderr for error messages
                 if result.stderr:
-                    print(f"  ⚠️  Warning: PMD error: {result.stderr[:200]}")
+                    stderr = result.stderr.decode("utf-8", errors="replace")
+                    print(f"  ⚠️  Warning: PMD error: {stderr[:200]}")
                 return []
             
             # Parse JSON output
@@ -149,8 +180,6 @@ class JavaPMDChecker(BaseSyntaxChecker):
             
             # PMD outputs JSON - could be an object with files array
             try:
-                data = json.loads(stdout)
-                
                 # PMD JSON format:
                 # {
                 #   "version": "7.x.x",
@@ -178,17 +207,10 @@ class JavaPMDChecker(BaseSyntaxChecker):
                 #   ]
                 # }
                 
-                if not isinstance(data, dict):
-                    return []
-                
-                files_data = data.get("files", [])
-                if not isinstance(files_data, list):
-                    return []
-                
                 # Filter to only files we're interested in
                 file_paths_set = set(relative_paths)
                 
-                for file_data in files_data:
+                for file_data in _iter_pmd_files(stdout):
                     if not isinstance(file_data, dict):
                         continue
                     
@@ -198,19 +220,26 @@ class JavaPMDChecker(BaseSyntaxChecker):
                         continue
                     
                     # Get relative path from repo_path
-                    file_path = Path(filename)
-                    if file_path.is_absolute():
-                        try:
-                            file_path = file_path.relative_to(repo_path)
-                        except ValueError:
-                            # File is outside repo, skip
+                    # PMD echoes the -d arguments, so the common case is an exact match;
+                    # other spellings are normalized through Path
+                    if filename in file_paths_set:
+                        file_path_str = filename
+                    elif filename.startswith(repo_prefix) and filename[len(repo_prefix):] in file_paths_set:
+                        file_path_str = filename[len(repo_prefix):]
+                    else:
+                        file_path = Path(filename)
+                        if file_path.is_absolute():
+                            try:
+                                file_path = file_path.relative_to(repo_path)
+                            except ValueError:
+                                # File is outside repo, skip
+                                continue
+                        
+                        # Check if this file is in our list
+                        file_path_str = str(file_path)
+                        if file_path_str not in file_paths_set:
                             continue
                     
-                    # Check if this file is in our list
-                    file_path_str = str(file_path)
-                    if file_path_str not in file_paths_set:
-                        continue
-                    
                     # Process violations for this file
                     violations = file_data.get("violations", [])
                     if not isinstance(violations, list):
@@ -231,7 +260,7 @@ class JavaPMDChecker(BaseSyntaxChecker):
                             continue
                         
                         # Extract rule code
-                        rule = violation.get("rule", "") or violation.get("ruleName", "")
+                        rule = str(violation.get("rule") or violation.get("ruleName") or "")
                         
                         # Determine severity based on priority
                         # PMD priority: 1=Blocker, 2=Critical, 3=Major, 4=Minor, 5=Info
@@ -253,7 +282,7 @@ class JavaPMDChecker(BaseSyntaxChecker):
                 
                 return errors
             
-            except json.JSONDecodeError:
+            except _PMD_PARSE_ERRORS:
                 # If JSON parsing fails, try to parse text output as fallback
                 # (though this shouldn't happen with -f json)
                 return []
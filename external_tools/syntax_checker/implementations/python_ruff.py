@@ -6,7 +6,6 @@ a fast Python linter written in Rust.
 
 import json
 import shutil
-import subprocess
 from pathlib import Path
 from typing import List
 
@@ -96,14 +95,7 @@ class PythonRuffChecker(BaseSyntaxChecker):
                 *relative_paths
             ]
             
-            result = subprocess.run(
-                cmd,
-                cwd=repo_path,
-                capture_output=True,
-                text=True,
-                check=False,  # Don't raise on non-zero exit (ruff returns non-zero if errors found)
-                encoding="utf-8"
-            )
+            result = await self._run_command(cmd, cwd=repo_path, text=True)
             
             # Ruff returns non-zero exit code if errors are found, which is expected
             # We only care about the JSON output
@@ -149,11 +141,11 @@ class PythonRuffChecker(BaseSyntaxChecker):
                 # Or: {"code": {...}, "message": "...", "location": {...}, "filename": "..."}
                 code_obj = data.get("code", {})
                 if isinstance(code_obj, dict):
-                    code = code_obj.get("code", "") or code_obj.get("name", "")
+                    code = str(code_obj.get("code") or code_obj.get("name") or "")
                 else:
                     code = str(code_obj) if code_obj else ""
                 
-                message = data.get("message", "")
+                message = str(data.get("message") or "")
                 location = data.get("location", {})
                 filename = data.get("filename", "")
                 
@@ -169,7 +161,10 @@ class PythonRuffChecker(BaseSyntaxChecker):
                         # File is outside repo, skip
                         continue
                 
-                line_num = location.get("row", 1) if isinstance(location, dict) else 1
+                line_num = location.get("row") if isinstance(location, dict) else None
+                if not isinstance(line_num, int):
+                    # e.g. "row": null for file-level diagnostics
+                    line_num = 1
                 
                 # Determine severity based on error code
                 # Ruff error codes: E = error, W = warning, F = error (pyflakes), etc.
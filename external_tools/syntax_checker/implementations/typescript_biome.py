@@ -6,7 +6,6 @@ a fast linter written in Rust that replaces ESLint and Prettier.
 
 import json
 import shutil
-import subprocess
 from pathlib import Path
 from typing import List
 
@@ -109,14 +108,7 @@ class TypeScriptBiomeChecker(BaseSyntaxChecker):
                 *relative_paths
             ]
             
-            result = subprocess.run(
-                cmd,
-                cwd=repo_path,
-                capture_output=True,
-                text=True,
-                check=False,  # Don't raise on non-zero exit
-                encoding="utf-8"
-            )
+            result = await self._run_command(cmd, cwd=repo_path, text=True)
             
             # Biome returns non-zero exit code if errors are found
             # Exit codes: 0 = no errors, 1 = errors found
@@ -225,10 +217,12 @@ class TypeScriptBiomeChecker(BaseSyntaxChecker):
                     if isinstance(span, dict):
                         start = span.get("start", {})
                         if isinstance(start, dict):
-                            line_num = start.get("line", 1)
+                            line_num = start.get("line")
                             # Biome uses 0-indexed lines, convert to 1-indexed
                             if isinstance(line_num, int):
                                 line_num = line_num + 1
+                            else:
+                                line_num = 1
                         else:
                             line_num = 1
                     else:
@@ -236,6 +230,9 @@ class TypeScriptBiomeChecker(BaseSyntaxChecker):
                     
                     # Extract rule code
                     rule = diag.get("rule", "") or diag.get("code", "")
+                    if isinstance(rule, dict):
+                        rule = rule.get("name", "") or rule.get("code", "")
+                    rule = str(rule) if rule else ""
                     
                     errors.append(LintError(
                         file=str(file_path),
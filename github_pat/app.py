@@ -13,6 +13,7 @@ from github_pat.git_cache import RepoCache
 from github_pat.settings import Settings
 from github_pat.webhook import verify_github_signature
 from github_pat.worker import JobWorker, WorkerDeps
+from util.llm_cache import install_llm_memory_cache
 
 
 @asynccontextmanager
@@ -25,6 +26,9 @@ async def lifespan(app: FastAPI):
     if not settings.allowed_repos:
         raise RuntimeError("Missing env: ALLOWED_REPOS (comma-separated owner/repo)")
 
+    # Opt-in process-wide LLM response cache (LLM_MEMORY_CACHE=1)
+    install_llm_memory_cache()
+
     store = JobStore(settings.db_path)
     store.init()
 
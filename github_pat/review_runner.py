@@ -82,12 +82,16 @@ async def run_review_for_pr(
     except Exception:
         changed_files = extract_files_from_diff(pr_diff, config=config)
 
-    results = await run_multi_agent_workflow(
-        diff_context=pr_diff,
-        changed_files=changed_files,
-        config=config,
-        lint_errors=lint_errors,
-    )
+    try:
+        results = await run_multi_agent_workflow(
+            diff_context=pr_diff,
+            changed_files=changed_files,
+            config=config,
+            lint_errors=lint_errors,
+        )
+    finally:
+        # Background asset saves (repo map) must land before the next PR reuses the storage
+        await storage.wait_pending_saves()
     try:
         save_observations_to_log(
             results,
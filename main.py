@@ -18,12 +18,12 @@ from pathlib import Path
 from typing import List, Optional
 
 from core.config import Config
-from dao.factory import get_storage
+from dao.factory import get_storage_async
 from assets.implementations.repo_map import RepoMapBuilder
 from agents.workflow import run_multi_agent_workflow
-from external_tools.syntax_checker import CheckerFactory, get_config
-from external_tools.syntax_checker.config_loader import create_checker_instance
+from external_tools.syntax_checker import BaseSyntaxChecker, CheckerFactory, get_config
 from util.lite_cpg_utils import prepare_lite_cpg_db
+from util.llm_cache import install_llm_memory_cache
 from util import (
     generate_asset_key,
     get_git_info,
@@ -67,39 +67,13 @@ async def run_syntax_checking(
         if not changed_files:
             return []
         
-        # Group files by checker
-        checker_groups = CheckerFactory.get_checkers_for_files(changed_files)
+        # Directory listings may be stale from a previous run in this process
+        BaseSyntaxChecker.clear_existence_cache()
         
-        if not checker_groups:
-            return []
-        
-        # Run all checkers
-        all_errors = []
-        config = get_config()
-        
-        for checker_class, files in checker_groups.items():
-            try:
-                # Create checker instance with configuration (if available)
-                checker = create_checker_instance(checker_class, config)
-                
-                errors = await checker.check(repo_path, files)
-                # Convert LintError objects to dictionaries
-                all_errors.extend([
-                    {
-                        "file": error.file,
-                        "line": error.line,
-                        "message": error.message,
-                        "severity": error.severity,
-                        "code": error.code
-                    }
-                    for error in errors
-                ])
-            except Exception as e:
-                # Gracefully handle checker failures
-                print(f"  ⚠️  Warning: {checker_class.__name__} failed: {e}")
-                continue
-        
-        return all_errors
+        # Run all applicable checkers concurrently (failures are reported and skipped)
+        errors = await CheckerFactory.run_all(repo_path, changed_files, get_config())
+        # Convert LintError objects to dictionaries
+        return [error.to_dict() for error in errors]
     
     except Exception as e:
         # Gracefully handle any errors in syntax checking
@@ -133,8 +107,7 @@ async def build_repo_map_if_needed(
         asset_key = generate_asset_key(workspace_root, branch, commit)
         
         # Initialize storage
-        storage = get_storage()
-        await storage.connect()
+        storage = await get_storage_async()
         
         # Check if repo_map already exists for this specific repo/branch/commit
         exists = await storage.exists("assets", asset_key)
@@ -146,9 +119,10 @@ async def build_repo_map_if_needed(
         # Build the repo map (will save to DAO automatically with the unique key)
         print(f"🔨 Building repository map (key: {asset_key})...")
         builder = RepoMapBuilder()
-        repo_map_data = await builder.build(workspace_root, asset_key=asset_key)
+        # The save overlaps lint checking and the workflow; readers of this key wait for it
+        repo_map_data = await builder.build(workspace_root, asset_key=asset_key, background_save=True)
         
-        print(f"✅ Repository map built and saved ({repo_map_data.get('file_count', 0)} files)")
+        print(f"✅ Repository map built ({repo_map_data.get('file_count', 0)} files)")
         return asset_key
     
     except Exception as e:
@@ -298,8 +272,7 @@ async def run_review(
 
     # Step 1: Initialize Storage (DAO layer)
     log("\n💾 Initializing storage backend...")
-    storage = get_storage()
-    await storage.connect()
+    storage = await get_storage_async()
     log("✅ Storage initialized")
     
     # Step 2: Build Assets if needed
@@ -413,6 +386,9 @@ async def run_review(
         import traceback
         traceback.print_exc()
         return 1
+    finally:
+        # Make sure background asset saves (repo map) have landed before exiting
+        await storage.wait_pending_saves()
     
     return 0
 
@@ -420,6 +396,8 @@ async def run_review(
 async def main():
     """代码审查系统主入口（命令行模式）。"""
     args = parse_arguments()
+    # 可选的进程级 LLM 内存缓存（LLM_MEMORY_CACHE=1）
+    install_llm_memory_cache()
     
     return await run_review(
         repo_path=Path(args.repo),
@@ -1,7 +1,8 @@
 """代码审查系统的文件读取工具。"""
 
+import asyncio
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Iterable, Optional
 from pydantic import Field
 from tools.base import BaseTool
 
@@ -34,6 +35,29 @@ class ReadFileTool(BaseTool):
                 - "encoding": The encoding used.
                 - "error": Optional error message if reading failed.
         """
+        return self._read(file_path, kwargs.get("encoding", "utf-8"), kwargs.get("max_lines"))
+    
+    async def run_batch(
+        self,
+        file_paths: Iterable[str],
+        max_lines: Optional[int] = None,
+        encoding: str = "utf-8",
+    ) -> Dict[str, str]:
+        """批量读取多个文件，返回 文件路径 -> 内容 的字典。
+        
+        整批文件在同一个工作线程中顺序读取，只需一次线程切换；单个文件时直接读取。
+        读取失败的文件内容为空字符串。
+        """
+        paths = list(dict.fromkeys(file_paths))
+        
+        def _read_all() -> Dict[str, str]:
+            return {p: self._read(p, encoding, max_lines)["content"] for p in paths}
+        
+        if len(paths) <= 1:
+            return _read_all()
+        return await asyncio.to_thread(_read_all)
+    
+    def _read(self, file_path: str, encoding: str, max_lines: Optional[int]) -> Dict[str, Any]:
         try:
             file_path_obj = Path(file_path)
             if not file_path_obj.is_absolute():
@@ -50,9 +74,6 @@ class ReadFileTool(BaseTool):
                     "error": f"File not found: {file_path_obj}"
                 }
             
-            encoding = kwargs.get("encoding", "utf-8")
-            max_lines = kwargs.get("max_lines")
-            
             with open(file_path_obj, "r", encoding=encoding) as f:
                 lines = f.readlines()
                 line_count = len(lines)
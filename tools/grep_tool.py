@@ -151,25 +151,31 @@ def _grep_internal(
             return (2, deprioritized.index(dir_name), dir_name)
         return (1, 0, dir_name)
 
+    # 相对路径直接从已知的根路径前缀切片得到，避免每个文件构造 Path.relative_to()
+    repo_str = str(repo_path)
+    root_prefix_len = len(repo_str) if repo_str.endswith(os.sep) else len(repo_str) + 1
+
     # 遍历文件
     for root, dirs, files in os.walk(repo_path):
         # 过滤目录
         dirs[:] = [d for d in dirs if not _should_skip_directory(d)]
         dirs.sort(key=_dir_sort_key)
         files.sort()
+        relative_dir = root[root_prefix_len:]
         
         for file_name in files:
             file_path = Path(root) / file_name
+            relative_path = os.path.join(relative_dir, file_name) if relative_dir else file_name
             
             # 检查文件是否匹配包含模式
             matches_include = any(
-                fnmatch.fnmatch(file_name, pattern) or fnmatch.fnmatch(str(file_path.relative_to(repo_path)), pattern)
+                fnmatch.fnmatch(file_name, pattern) or fnmatch.fnmatch(relative_path, pattern)
                 for pattern in include_list
             )
             
             # 检查文件是否匹配排除模式
             matches_exclude = any(
-                fnmatch.fnmatch(file_name, pattern) or fnmatch.fnmatch(str(file_path.relative_to(repo_path)), pattern)
+                fnmatch.fnmatch(file_name, pattern) or fnmatch.fnmatch(relative_path, pattern)
                 for pattern in exclude_list
             )
             
@@ -201,9 +207,8 @@ def _grep_internal(
                         context_lines_list.append(f"{ctx_line_num}: {ctx_line.rstrip()}")
                     
                     # 构建结果块（JSON 格式）
-                    relative_path = file_path.relative_to(repo_path)
                     result_block = {
-                        "file": str(relative_path),
+                        "file": relative_path,
                         "line_number": line_num,
                         "matched_line": line.rstrip(),
                         "context_start_line": start_line,
@@ -9,7 +9,8 @@ import json
 from pathlib import Path
 from typing import Optional, Dict, Any, List, Tuple
 from langchain_core.tools import tool, BaseTool
-from dao.factory import get_storage
+from dao.factory import get_storage_async
+from tools.grep_tool import _grep_internal
 
 
 def create_tools_with_context(
@@ -39,8 +40,7 @@ def create_tools_with_context(
             包含 summary, file_count, files, source_path, error 的字典。
         """
         try:
-            storage = get_storage()
-            await storage.connect()
+            storage = await get_storage_async()
             
             key = asset_key if asset_key else "repo_map"
             repo_map_data = await storage.load("assets", key)
@@ -249,9 +249,6 @@ def create_tools_with_context(
         Returns:
             包含所有匹配项的格式化字符串，包含文件路径、匹配行和上下文。
         """
-        from tools.grep_tool import _grep_internal
-        import os
-        import json
         
         repo_root = workspace_root_str if workspace_root_str else (os.getenv("REPO_ROOT") or os.getcwd())
         
@@ -3,7 +3,7 @@
 from typing import Any, Dict, Optional
 from pydantic import Field
 from tools.base import BaseTool
-from dao.factory import get_storage
+from dao.factory import get_storage_async
 
 
 class FetchRepoMapTool(BaseTool):
@@ -32,8 +32,7 @@ class FetchRepoMapTool(BaseTool):
                 - "error": Optional error message if fetching failed.
         """
         try:
-            storage = get_storage()
-            await storage.connect()
+            storage = await get_storage_async()
             
             # Use asset_key if set, otherwise fall back to "repo_map" for backward compatibility
             key = self.asset_key if self.asset_key else "repo_map"
@@ -5,6 +5,7 @@
 """
 
 import logging
+import re
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 from unidiff import PatchSet
@@ -342,7 +343,6 @@ def extract_file_diff(diff_context: str, file_path: str) -> str:
         logger.warning(f"Failed to parse diff with line numbers for {file_path}: {e}, falling back to raw diff")
     
     # Fallback: Extract raw diff section using regex (original behavior)
-    import re
     patterns = [
         rf"diff --git.*{re.escape(file_path)}.*?\n(.*?)(?=\ndiff --git|\Z)",
         rf"--- a/{re.escape(file_path)}.*?\n(.*?)(?=\n--- a/|\Z)",
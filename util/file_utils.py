@@ -1,8 +1,9 @@
 """代码审查系统的文件读取工具。"""
 
+import asyncio
 import logging
 from pathlib import Path
-from typing import Optional
+from typing import Dict, Iterable, Optional
 
 from core.config import Config
 
@@ -45,3 +46,52 @@ def read_file_content(file_path: str, config: Optional[Config] = None) -> str:
         logger.warning(f"Error reading file content for {file_path}: {e}")
         return ""
 
+
+async def read_files_concurrently(
+    file_paths: Iterable[str],
+    config: Optional[Config] = None,
+    *,
+    concurrency: int = 8,
+    max_total_chars: Optional[int] = None,
+    timeout: Optional[float] = None,
+) -> Dict[str, str]:
+    """在工作线程中并发读取多个文件。
+    
+    并发数由信号量限制；累计读取字符数达到 `max_total_chars` 后不再发起新的读取，
+    超过 `timeout` 仍未完成的读取被放弃。未读取的文件不出现在结果中，调用方可按需回退读取。
+    
+    Args:
+        file_paths: 文件路径列表（重复路径只读取一次）。
+        config: 包含 workspace_root 的配置对象。
+        concurrency: 最大并发读取数。
+        max_total_chars: 总字符预算（可选）。
+        timeout: 整体超时秒数（可选）。
+    
+    Returns:
+        文件路径 -> 文件内容的字典。
+    """
+    paths = list(dict.fromkeys(file_paths))
+    semaphore = asyncio.Semaphore(max(1, int(concurrency)))
+    results: Dict[str, str] = {}
+    total_chars = 0
+    
+    async def _read(path: str) -> None:
+        nonlocal total_chars
+        async with semaphore:
+            if max_total_chars is not None and total_chars >= max_total_chars:
+                return
+            content = await asyncio.to_thread(read_file_content, path, config)
+            total_chars += len(content)
+            results[path] = content
+    
+    tasks = [asyncio.create_task(_read(p)) for p in paths]
+    if tasks:
+        _, pending = await asyncio.wait(tasks, timeout=timeout)
+        for task in pending:
+            task.cancel()
+        if pending:
+            logger.warning(f"File reads timed out: {len(pending)}/{len(paths)} files not read")
+    skipped = len(paths) - len(results)
+    if max_total_chars is not None and skipped and total_chars >= max_total_chars:
+        logger.info(f"File read budget ({max_total_chars} chars) reached; {skipped} files not read")
+    return results
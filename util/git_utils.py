@@ -716,6 +716,16 @@ def generate_asset_key(repo_path: Path, branch: Optional[str] = None, commit: Op
     return key
 
 
+# Matches `--- a/path` / `+++ b/path` headers (group 1) and `rename from/to path` (group 2).
+# The `a/`/`b/` prefix, a leading slash, surrounding whitespace and `/dev/null` are handled
+# inside the pattern so the scan does not fall back to per-match Python string work.
+_DIFF_FILE_LINE_RE = re.compile(
+    r"^(?:---|\+\+\+) [ \t]*(?!/dev/null[ \t\r]*$)(?:[ab]/)?/?(.*?)[ \t\r]*$"
+    r"|^rename (?:from|to) (.+)$",
+    re.MULTILINE,
+)
+
+
 def extract_files_from_diff(diff_content: str, config: Optional[Config] = None) -> List[str]:
     """Extract file paths from a Git diff string.
     
@@ -732,35 +742,9 @@ def extract_files_from_diff(diff_content: str, config: Optional[Config] = None)
     if not diff_content or not diff_content.strip():
         return []
     
-    files = set()
-    lines = diff_content.split("\n")
-    
-    for line in lines:
-        # Match unified diff format: --- a/path/to/file or +++ b/path/to/file
-        # Also match: --- /dev/null or +++ /dev/null (for new/deleted files)
-        if line.startswith("--- ") or line.startswith("+++ "):
-            # Extract the file path (remove prefix like "a/" or "b/")
-            path_part = line[4:].strip()
-            # Skip /dev/null entries
-            if path_part == "/dev/null":
-                continue
-            # Remove "a/" or "b/" prefix if present
-            if path_part.startswith("a/") or path_part.startswith("b/"):
-                path_part = path_part[2:]
-            # Remove leading slash if present
-            if path_part.startswith("/"):
-                path_part = path_part[1:]
-            if path_part:
-                files.add(path_part)
-        
-        # Also match rename/copy operations: rename from/to
-        rename_match = re.match(r"^rename from (.+)$", line)
-        if rename_match:
-            files.add(rename_match.group(1))
-        
-        rename_to_match = re.match(r"^rename to (.+)$", line)
-        if rename_to_match:
-            files.add(rename_to_match.group(1))
+    # Single C-level pass over the whole diff: unified headers (---/+++) and rename from/to.
+    files = {header or rename for header, rename in _DIFF_FILE_LINE_RE.findall(diff_content)}
+    files.discard("")
     
     return filter_changed_files(sorted(list(files)), config)
 
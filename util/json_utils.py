@@ -5,36 +5,52 @@
 
 import json
 import re
-from typing import Optional
+from typing import Any, Optional, Tuple
 
+try:
+    import orjson
+except ImportError:  # optional dependency
+    orjson = None
 
-def extract_json_from_text(text: str) -> Optional[str]:
-    """从文本中提取 JSON 字符串。
-    
-    支持以下格式：
-    1. Markdown 代码块：```json {...} ``` 或 ``` {...} ```
-    2. 纯 JSON 对象：{...}
-    3. 文本中的 JSON 对象（查找平衡的大括号）
-    
-    Args:
-        text: 包含 JSON 的文本。
-    
-    Returns:
-        提取的 JSON 字符串，如果无法提取则返回 None。
+# json.loads(..., strict=False) 每次都会新建解码器；解码器无状态，复用同一个实例
+_LENIENT_DECODER = json.JSONDecoder(strict=False)
+
+# Markdown 代码块：```json ... ``` 或 ``` ... ```
+_JSON_FENCE_RE = re.compile(r'```(?:json)?\s*\n?(.*?)\n?```', re.DOTALL)
+
+
+def loads_json(text: str) -> Any:
+    """解析 JSON 文本（安装了 orjson 时优先使用）。
+
+    orjson 拒绝的输入（如 NaN、字符串内的控制字符）回退到标准库宽松解析，
+    与 PydanticOutputParser 的行为保持一致。
+
+    Raises:
+        json.JSONDecodeError: 文本不是合法 JSON。
     """
-    if not text:
-        return None
+    if orjson is not None:
+        try:
+            return orjson.loads(text)
+        except orjson.JSONDecodeError:
+            pass
+    return _LENIENT_DECODER.decode(text)
+
+
+def _find_json(text: str) -> Optional[Tuple[str, Any]]:
+    """定位文本中的第一个合法 JSON，返回 (JSON 字符串, 解析结果)。"""
+    # 快速路径：严格提示词下模型通常直接返回纯 JSON
+    stripped = text.strip()
+    if stripped.startswith('{'):
+        try:
+            return stripped, loads_json(stripped)
+        except json.JSONDecodeError:
+            pass
     
     # 方法1: 提取 markdown 代码块中的 JSON
-    # 匹配模式：```json ... ``` 或 ``` ... ```
-    json_block_pattern = r'```(?:json)?\s*\n?(.*?)\n?```'
-    matches = re.finditer(json_block_pattern, text, re.DOTALL)
-    for match in matches:
+    for match in _JSON_FENCE_RE.finditer(text):
         try:
             json_str = match.group(1).strip()
-            # 验证 JSON 有效性
-            json.loads(json_str)
-            return json_str
+            return json_str, loads_json(json_str)
         except json.JSONDecodeError:
             continue
     
@@ -53,9 +69,7 @@ def extract_json_from_text(text: str) -> Optional[str]:
             if brace_count == 0 and start_idx != -1:
                 json_str = text[start_idx:i+1]
                 try:
-                    # 验证 JSON 有效性
-                    json.loads(json_str)
-                    return json_str
+                    return json_str, loads_json(json_str)
                 except json.JSONDecodeError:
                     # 继续查找下一个可能的 JSON 对象
                     start_idx = -1
@@ -66,10 +80,44 @@ def extract_json_from_text(text: str) -> Optional[str]:
         cleaned_text = text.strip()
         # 如果文本以 { 开头且以 } 结尾，尝试直接解析
         if cleaned_text.startswith('{') and cleaned_text.endswith('}'):
-            json.loads(cleaned_text)
-            return cleaned_text
+            return cleaned_text, loads_json(cleaned_text)
     except json.JSONDecodeError:
         pass
     
     return None
 
+
+def extract_json_from_text(text: str) -> Optional[str]:
+    """从文本中提取 JSON 字符串。
+    
+    支持以下格式：
+    1. Markdown 代码块：```json {...} ``` 或 ``` {...} ```
+    2. 纯 JSON 对象：{...}
+    3. 文本中的 JSON 对象（查找平衡的大括号）
+    
+    Args:
+        text: 包含 JSON 的文本。
+    
+    Returns:
+        提取的 JSON 字符串，如果无法提取则返回 None。
+    """
+    if not text:
+        return None
+    found = _find_json(text)
+    return found[0] if found else None
+
+
+def load_json_from_text(text: str) -> Optional[Any]:
+    """从文本中提取并解析 JSON（每个候选只解析一次）。
+
+    与 `extract_json_from_text` 使用相同的提取规则，但直接返回解析结果，
+    调用方无需对提取出的字符串再次 `json.loads`。
+
+    Returns:
+        解析后的 JSON 值，如果无法提取则返回 None。
+    """
+    if not text:
+        return None
+    found = _find_json(text)
+    return found[1] if found else None
+
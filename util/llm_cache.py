@@ -0,0 +1,161 @@
+"""LLM 响应的磁盘缓存。
+
+CI 对同一 PR 状态的重复运行会产生完全相同的提示词。以"模型 + 调用参数 + 提示词内容"的
+SHA-256 为键，通过存储后端（`dao.factory.get_storage`）持久化响应，命中时跳过 LLM 往返。
+
+仅缓存确定性（低 temperature）调用；条目超过 TTL 后视为未命中。
+- `LLM_DISK_CACHE=0` 关闭缓存
+- `LLM_DISK_CACHE_TTL_SECONDS` 条目有效期（默认 3600，<=0 表示不过期）
+
+另有可选的进程内精确匹配缓存（langchain 全局 LLM 缓存，作用于进程内所有模型调用，无 TTL），
+默认关闭，仅由入口（命令行 `main`、GitHub worker 启动）通过 `install_llm_memory_cache` 安装：
+- `LLM_MEMORY_CACHE=1` 启用
+- `LLM_MEMORY_CACHE_MAX_ITEMS` 容量（默认 2048）
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import time
+from typing import Any, Dict, Optional, Sequence
+
+from langchain_core.caches import InMemoryCache
+from langchain_core.globals import get_llm_cache, set_llm_cache
+from langchain_core.messages import BaseMessage, message_to_dict, messages_from_dict
+
+from dao.factory import get_storage
+
+logger = logging.getLogger(__name__)
+
+LLM_CACHE_COLLECTION = "llm_response_cache"
+
+# 高于该 temperature 的调用输出不可复现，缓存没有意义
+_MAX_CACHEABLE_TEMPERATURE = 0.3
+
+
+def _unwrap_model(llm: Any) -> Any:
+    """`llm.bind_tools(...)` 返回 RunnableBinding，模型参数在 `bound` 上。"""
+    return getattr(llm, "bound", None) or llm
+
+
+def model_identity(llm: Any) -> str:
+    """模型标识（用于缓存键与缓存作用域）。"""
+    model = _unwrap_model(llm)
+    return str(getattr(model, "model_name", None) or getattr(model, "model", None) or type(model).__name__)
+
+
+def disk_cache_enabled(llm: Any = None, **params: Any) -> bool:
+    """缓存开关：环境变量未关闭，且本次调用的 temperature 足够低。"""
+    if (os.getenv("LLM_DISK_CACHE") or "1").strip().lower() in ("0", "false", "no", "off"):
+        return False
+    temperature = params.get("temperature", getattr(_unwrap_model(llm), "temperature", None))
+    try:
+        return temperature is None or float(temperature) <= _MAX_CACHEABLE_TEMPERATURE
+    except (TypeError, ValueError):
+        return False
+
+
+def install_llm_memory_cache() -> bool:
+    """按 `LLM_MEMORY_CACHE` 安装进程级内存 LLM 缓存（仅在程序入口调用一次）。
+    
+    Returns:
+        是否已安装（已存在全局缓存时不覆盖）。
+    """
+    if (os.getenv("LLM_MEMORY_CACHE") or "0").strip().lower() not in ("1", "true", "yes", "on"):
+        return False
+    if get_llm_cache() is not None:
+        return True
+    try:
+        max_items = int(os.getenv("LLM_MEMORY_CACHE_MAX_ITEMS", "2048"))
+    except ValueError:
+        max_items = 2048
+    try:
+        set_llm_cache(InMemoryCache(maxsize=max(1, max_items)))
+    except TypeError:  # 旧版 langchain_core 不支持 maxsize
+        set_llm_cache(InMemoryCache())
+    return True
+
+
+def _ttl_seconds() -> float:
+    try:
+        return float(os.getenv("LLM_DISK_CACHE_TTL_SECONDS", "3600"))
+    except ValueError:
+        return 3600.0
+
+
+def llm_cache_key(llm: Any, messages: Sequence[BaseMessage], **params: Any) -> str:
+    """根据模型标识、调用参数（含绑定的工具）与消息内容生成缓存键。"""
+    temperature = params.pop("temperature", getattr(_unwrap_model(llm), "temperature", None))
+    parts = [
+        model_identity(llm),
+        repr(temperature),
+        repr(sorted(params.items())),
+        repr(getattr(llm, "kwargs", None)),
+    ]
+    for message in messages:
+        parts.append(message.type)
+        content = message.content
+        parts.append(content if isinstance(content, str) else repr(content))
+        tool_calls = getattr(message, "tool_calls", None)
+        if tool_calls:
+            parts.append(repr(tool_calls))
+    return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+
+async def _load_entry(key: str) -> Optional[Dict[str, Any]]:
+    try:
+        data = await get_storage().load(LLM_CACHE_COLLECTION, key)
+    except Exception as e:
+        logger.debug(f"LLM disk cache read failed ({key}): {e}")
+        return None
+    if not isinstance(data, dict):
+        return None
+    ttl = _ttl_seconds()
+    created_at = data.get("created_at")
+    if ttl > 0 and (not isinstance(created_at, (int, float)) or time.time() - created_at > ttl):
+        # 过期条目就地删除，避免缓存目录无限增长
+        try:
+            await get_storage().delete(LLM_CACHE_COLLECTION, key)
+        except Exception as e:
+            logger.debug(f"LLM disk cache delete failed ({key}): {e}")
+        return None
+    return data
+
+
+async def _save_entry(key: str, entry: Dict[str, Any]) -> None:
+    try:
+        await get_storage().save(LLM_CACHE_COLLECTION, key, {**entry, "created_at": time.time()})
+    except Exception as e:
+        logger.debug(f"LLM disk cache write failed ({key}): {e}")
+
+
+async def load_cached_response(key: str) -> Optional[str]:
+    """读取缓存的响应文本；未命中、过期或读取失败时返回 None。"""
+    data = await _load_entry(key)
+    if data and isinstance(data.get("response"), str):
+        return data["response"]
+    return None
+
+
+async def save_cached_response(key: str, response_text: str) -> None:
+    """写入响应文本（失败仅记录日志，不影响主流程）。"""
+    await _save_entry(key, {"response": response_text})
+
+
+async def load_cached_message(key: str) -> Optional[BaseMessage]:
+    """读取缓存的完整响应消息（保留 tool_calls）；未命中时返回 None。"""
+    data = await _load_entry(key)
+    if not data or not isinstance(data.get("message"), dict):
+        return None
+    try:
+        return messages_from_dict([data["message"]])[0]
+    except Exception as e:
+        logger.debug(f"LLM disk cache entry is not a valid message ({key}): {e}")
+        return None
+
+
+async def save_cached_message(key: str, message: BaseMessage) -> None:
+    """写入完整响应消息（失败仅记录日志，不影响主流程）。"""
+    await _save_entry(key, {"message": message_to_dict(message)})
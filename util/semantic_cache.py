@@ -0,0 +1,126 @@
+"""基于向量相似度的 LLM 响应缓存（精确缓存之后的第二层）。
+
+仅空白/琐碎 diff 行不同的提示词通常得到几乎相同的响应：精确缓存未命中时，用本地小模型
+嵌入提示词，与同一作用域（模型 + 文件）内近期条目做余弦相似度比对，超过阈值直接复用响应。
+
+默认关闭，需要可选依赖 numpy 与 sentence-transformers：
+- `LLM_SEMANTIC_CACHE=1` 启用
+- `LLM_SEMANTIC_CACHE_THRESHOLD` 相似度阈值（默认 0.9）
+- `LLM_SEMANTIC_CACHE_MODEL` 嵌入模型（默认 all-MiniLM-L6-v2）
+- `LLM_SEMANTIC_CACHE_MAX_ITEMS` LRU 容量（默认 1000）
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Optional, Tuple
+
+try:
+    import numpy as np
+    from sentence_transformers import SentenceTransformer
+except ImportError:  # optional dependency
+    np = None
+    SentenceTransformer = None
+
+logger = logging.getLogger(__name__)
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, str(default)))
+    except ValueError:
+        return float(default)
+
+
+class SemanticCache:
+    """进程内的嵌入相似度缓存（LRU 淘汰）。"""
+
+    def __init__(self, model_name: str, threshold: float, max_items: int):
+        self.model_name = model_name
+        self.threshold = threshold
+        self.max_items = max(1, max_items)
+        self._model: Any = None
+        # Lookups/stores run in worker threads (asyncio.to_thread).
+        self._lock = threading.Lock()
+        # (scope, text) -> (normalized embedding, response)
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[Any, str]]" = OrderedDict()
+
+    def _embed(self, text: str) -> Any:
+        with self._lock:
+            if self._model is None:
+                self._model = SentenceTransformer(self.model_name)
+        return self._model.encode(text, normalize_embeddings=True)
+
+    def lookup(self, scope: str, text: str) -> Optional[str]:
+        """返回同一作用域内相似度最高且超过阈值的响应。"""
+        with self._lock:
+            candidates = [(k, v) for k, v in self._entries.items() if k[0] == scope]
+        if not candidates:
+            return None
+        emb = self._embed(text)
+        scores = np.stack([v[0] for _, v in candidates]) @ emb
+        best = int(np.argmax(scores))
+        if float(scores[best]) < self.threshold:
+            return None
+        key, (_, response) = candidates[best]
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+        return response
+
+    def store(self, scope: str, text: str, response: str) -> None:
+        emb = self._embed(text)
+        with self._lock:
+            self._entries[(scope, text)] = (emb, response)
+            self._entries.move_to_end((scope, text))
+            while len(self._entries) > self.max_items:
+                self._entries.popitem(last=False)
+
+
+_semantic_cache: Optional[SemanticCache] = None
+_missing_deps_logged = False
+
+
+def get_semantic_cache() -> Optional[SemanticCache]:
+    """返回全局语义缓存；未启用或缺少可选依赖时返回 None。"""
+    global _semantic_cache, _missing_deps_logged
+    if (os.getenv("LLM_SEMANTIC_CACHE") or "0").strip().lower() not in ("1", "true", "yes", "on"):
+        return None
+    if SentenceTransformer is None:
+        if not _missing_deps_logged:
+            logger.warning("LLM_SEMANTIC_CACHE is set but numpy/sentence-transformers is not installed")
+            _missing_deps_logged = True
+        return None
+    if _semantic_cache is None:
+        _semantic_cache = SemanticCache(
+            model_name=os.getenv("LLM_SEMANTIC_CACHE_MODEL", "all-MiniLM-L6-v2"),
+            threshold=_env_float("LLM_SEMANTIC_CACHE_THRESHOLD", 0.9),
+            max_items=int(_env_float("LLM_SEMANTIC_CACHE_MAX_ITEMS", 1000)),
+        )
+    return _semantic_cache
+
+
+async def semantic_lookup(scope: str, text: str) -> Optional[str]:
+    """在线程中执行嵌入与相似度查找（失败视为未命中）。"""
+    cache = get_semantic_cache()
+    if cache is None:
+        return None
+    try:
+        return await asyncio.to_thread(cache.lookup, scope, text)
+    except Exception as e:
+        logger.debug(f"Semantic cache lookup failed: {e}")
+        return None
+
+
+async def semantic_store(scope: str, text: str, response: str) -> None:
+    cache = get_semantic_cache()
+    if cache is None:
+        return
+    try:
+        await asyncio.to_thread(cache.store, scope, text, response)
+    except Exception as e:
+        logger.debug(f"Semantic cache store failed: {e}")
@@ -0,0 +1,102 @@
+"""YAML 提取工具函数。
+
+从混合文本（包含 markdown 代码块、解释性文本等）中提取 YAML 映射，
+与 `util.json_utils.extract_json_from_text` 的行为保持对称。
+"""
+
+import json
+import re
+from typing import Any, Dict, Optional, Type
+
+import yaml
+from pydantic import BaseModel
+
+_YAML_BLOCK_RE = re.compile(r"```(?:ya?ml)?\s*\n?(.*?)\n?```", re.DOTALL | re.IGNORECASE)
+
+
+def _load_mapping(text: str) -> Optional[Dict[str, Any]]:
+    """解析 YAML 文本，仅当结果为映射（dict）时返回。"""
+    try:
+        data = yaml.safe_load(text)
+    except yaml.YAMLError:
+        return None
+    return data if isinstance(data, dict) else None
+
+
+def extract_yaml_from_text(text: str) -> Optional[str]:
+    """从文本中提取 YAML 映射字符串。
+
+    支持以下格式：
+    1. Markdown 代码块：```yaml ... ``` 或 ``` ... ```
+    2. 纯 YAML 映射文本
+    3. 文本前有解释性内容时，从第一个 `key:` 行开始截取
+
+    Args:
+        text: 包含 YAML 的文本。
+
+    Returns:
+        提取的 YAML 字符串，如果无法提取则返回 None。
+    """
+    if not text:
+        return None
+
+    # 方法1: 提取 markdown 代码块中的 YAML
+    for match in _YAML_BLOCK_RE.finditer(text):
+        yaml_str = match.group(1).strip()
+        if _load_mapping(yaml_str) is not None:
+            return yaml_str
+
+    # 方法2: 尝试直接解析整个文本
+    cleaned_text = text.strip()
+    if _load_mapping(cleaned_text) is not None:
+        return cleaned_text
+
+    # 方法3: 跳过前导说明文字，从第一个顶层 `key:` 行开始解析
+    lines = cleaned_text.splitlines()
+    for i, line in enumerate(lines):
+        if re.match(r"^[A-Za-z_][\w-]*\s*:", line):
+            candidate = "\n".join(lines[i:]).strip()
+            if _load_mapping(candidate) is not None:
+                return candidate
+            break
+
+    return None
+
+
+def load_yaml_mapping(text: str) -> Optional[Dict[str, Any]]:
+    """从文本中提取并解析 YAML 映射。
+
+    Returns:
+        解析后的字典，如果无法提取则返回 None。
+    """
+    yaml_text = extract_yaml_from_text(text)
+    if not yaml_text:
+        return None
+    return _load_mapping(yaml_text)
+
+
+def get_yaml_format_instructions(pydantic_object: Type[BaseModel]) -> str:
+    """生成要求模型以 YAML 输出指定 Pydantic 模型的格式说明。
+
+    与 `PydanticOutputParser.get_format_instructions()` 对应，但要求 YAML 输出，
+    以减少补全 token（无需引号、大括号和逗号）。
+    """
+    schema = pydantic_object.model_json_schema()
+    reduced_schema = {k: v for k, v in schema.items() if k not in ("title", "type")}
+    schema_str = json.dumps(reduced_schema, ensure_ascii=False)
+    return (
+        "The output should be formatted as a YAML instance that conforms to the JSON schema below.\n\n"
+        "As an example, for the schema "
+        '{"properties": {"foo": {"type": "array", "items": {"type": "string"}}}, "required": ["foo"]}\n'
+        "the YAML\n"
+        "```yaml\n"
+        "foo:\n"
+        "  - bar\n"
+        "  - baz\n"
+        "```\n"
+        "is a well-formatted instance of the schema.\n\n"
+        "Here is the output schema:\n"
+        f"```\n{schema_str}\n```\n\n"
+        "Output YAML only (no JSON, no explanations). Quote strings containing `: ` or `#`, "
+        "and use block scalars (`|`) for multi-line text."
+    )